@@ -0,0 +1,91 @@
+"""
+Micro-benchmark of the full-resolution slide diff: legacy per-call kernels
+vs. FrameWorkspace reused across frames.
+
+Reports time and peak scratch memory (traced by tracemalloc) per frame.
+
+    python benchmarks/bench_frame_diff.py --width 1920 --height 1080 --frames 50
+"""
+import argparse
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+from automixer.utils.vision import FrameWorkspace, sobel_edge
+
+
+def make_frames(width, height, count, seed=0):
+    rng = np.random.default_rng(seed)
+    base = np.full((height, width, 3), 40, dtype=np.uint8)
+    frames = []
+    for i in range(count):
+        frame = base.copy()
+        cv2.putText(
+            frame, f"Slide {i // 5}", (width // 10, height // 2),
+            cv2.FONT_HERSHEY_SIMPLEX, height / 200, (255, 255, 255), 4
+        )
+        noise = rng.integers(0, 3, frame.shape, dtype=np.uint8)
+        frames.append(cv2.add(frame, noise))
+    return frames
+
+
+def legacy_diff(frame1, frame2, edge_threshold):
+    frame_gray = cv2.cvtColor(frame1, cv2.COLOR_BGR2GRAY)
+    edge = cv2.cvtColor(sobel_edge(frame_gray), cv2.COLOR_GRAY2BGR)
+    diff = np.abs(frame1.astype(np.int16) - frame2.astype(np.int16)).astype(np.uint8)
+    diff *= edge < edge_threshold
+    return float(np.mean(diff))
+
+
+def workspace_diff(workspace, frame1, frame2, edge_threshold):
+    non_edge = workspace.non_edge_mask(frame1, edge_threshold)
+    return workspace.mean_abs_diff(frame1, frame2, mask=non_edge)
+
+
+def measure(name, fn, frames):
+    # Warm up once so one-time workspace buffers are not counted per frame
+    fn(frames[1], frames[0])
+
+    start = time.perf_counter()
+    for prev, frame in zip(frames, frames[1:]):
+        fn(frame, prev)
+    elapsed = time.perf_counter() - start
+
+    # numpy reports its buffers to tracemalloc; the peak above the baseline
+    # during a call is the scratch memory that call allocated
+    tracemalloc.start()
+    scratch = 0
+    for prev, frame in zip(frames, frames[1:]):
+        baseline = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        fn(frame, prev)
+        scratch += tracemalloc.get_traced_memory()[1] - baseline
+    tracemalloc.stop()
+
+    n = len(frames) - 1
+    print(
+        f"{name:>10}: {elapsed / n * 1000:8.2f} ms/frame, "
+        f"{scratch / n / 1e6:8.2f} MB peak scratch memory/frame"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--frames", type=int, default=30)
+    parser.add_argument("--edge-threshold", type=float, default=20)
+    args = parser.parse_args()
+
+    frames = make_frames(args.width, args.height, args.frames)
+    workspace = FrameWorkspace()
+
+    measure("legacy", lambda a, b: legacy_diff(a, b, args.edge_threshold), frames)
+    measure("workspace", lambda a, b: workspace_diff(workspace, a, b, args.edge_threshold), frames)
+    print(f"workspace buffers allocated in total: {workspace.allocations}")
+
+
+if __name__ == "__main__":
+    main()
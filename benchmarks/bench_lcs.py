@@ -0,0 +1,68 @@
+"""
+Benchmark of character-level LCS for the ROUGE-L scorer: the DP with
+traceback (`lcs`) vs. the bit-parallel length-only engine (`lcs_length`), and
+the per-update cost of the incremental engine (`BitParallelLCS`) as the
+transcription grows chunk by chunk.
+
+    python benchmarks/bench_lcs.py --sizes 500 1000 2000 5000
+"""
+import argparse
+import random
+import time
+
+from automixer.utils.text import BitParallelLCS, lcs, lcs_length
+
+
+WORDS = (
+    "the lord is my shepherd i shall not want he makes me lie down in green pastures "
+    "he leads me beside still waters he restores my soul amazing grace how sweet the sound"
+).split()
+
+
+def make_text(size, rng):
+    words = []
+    length = 0
+    while length < size:
+        word = rng.choice(WORDS)
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words)[:size]
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[500, 1000, 2000, 5000])
+    parser.add_argument("--chunk", type=int, default=40, help="Characters per transcription update")
+    parser.add_argument("--skip-dp-above", type=int, default=5000, help="Skip the full DP above this size")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    for size in args.sizes:
+        slide = make_text(size, rng)
+        transcription = make_text(size, rng)
+        fast_length, fast_time = timed(lcs_length, slide, transcription)
+        line = f"{size:>5} chars: bit-parallel {fast_time * 1000:9.2f} ms"
+        if size <= args.skip_dp_above:
+            (dp_length, _), dp_time = timed(lcs, slide, transcription)
+            assert dp_length == fast_length, "LCS length mismatch"
+            line += f", dp {dp_time * 1000:9.2f} ms ({dp_time / fast_time:6.1f}x)"
+
+        engine = BitParallelLCS(slide)
+        updates = range(0, len(transcription), args.chunk)
+        start = time.perf_counter()
+        for offset in updates:
+            engine.extend(transcription[offset:offset + args.chunk])
+        update_time = (time.perf_counter() - start) / len(updates)
+        assert engine.length == fast_length, "Incremental LCS length mismatch"
+        line += f", incremental {update_time * 1000:7.3f} ms/update"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Benchmark of the fuzzy word LCS of the ROUGE-1gram scorer: the reference
+`lcs_1gram`, the incremental pure-Python engine and the NumPy-vectorized
+engine, from scratch and per transcription update. Their agreement with
+`lcs_1gram` is checked in tests/test_text.py.
+
+    python benchmarks/bench_lcs_1gram.py --slide-words 60 100 --transcript-words 200 500
+"""
+import argparse
+import random
+import time
+
+from automixer.utils.text import IncrementalLCS1Gram, VectorizedLCS1Gram, WordMatcher, lcs_1gram
+
+
+WORDS = (
+    "amazing grace how sweet the sound that saved a wretch like me i once was lost but now am found "
+    "was blind but now i see twas grace that taught my heart to fear and grace my fears relieved"
+).split()
+
+ENGINES = {
+    "python": IncrementalLCS1Gram,
+    "numpy": VectorizedLCS1Gram,
+}
+
+
+def misheard(word, rng):
+    """Word with a random character dropped or replaced, like transcription errors."""
+    if len(word) < 2 or rng.random() < 0.7:
+        return word
+    i = rng.randrange(len(word))
+    return word[:i] + rng.choice(["", "e", "a"]) + word[i + 1:]
+
+
+def make_transcript(slide, n_words, rng):
+    return [misheard(rng.choice(slide) if rng.random() < 0.8 else rng.choice(WORDS), rng) for _ in range(n_words)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--slide-words", type=int, nargs="+", default=[60, 100])
+    parser.add_argument("--transcript-words", type=int, nargs="+", default=[200, 500])
+    parser.add_argument("--tolerance", type=int, default=3)
+    parser.add_argument("--chunk", type=int, default=8, help="Words per transcription update")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    for slide_words in args.slide_words:
+        slide = [rng.choice(WORDS) for _ in range(slide_words)]
+        for transcript_words in args.transcript_words:
+            transcript = make_transcript(slide, transcript_words, rng)
+            start = time.perf_counter()
+            lcs_1gram(slide, transcript, args.tolerance)
+            line = f"{slide_words:>4} x {transcript_words:<5} words: lcs_1gram {(time.perf_counter() - start) * 1000:8.1f} ms"
+            for name, cls in ENGINES.items():
+                start = time.perf_counter()
+                engine = cls(slide, args.tolerance, WordMatcher(args.tolerance))
+                engine.update(transcript)
+                engine.result()
+                scratch = time.perf_counter() - start
+
+                # Growing transcription, with a warm word pair cache as in a live session
+                engine = cls(slide, args.tolerance, engine.matcher)
+                updates = range(args.chunk, transcript_words + args.chunk, args.chunk)
+                start = time.perf_counter()
+                for end in updates:
+                    engine.update(transcript[:end])
+                    engine.result()
+                per_update = (time.perf_counter() - start) / len(updates)
+                line += f", {name} {scratch * 1000:8.1f} ms ({per_update * 1000:6.2f} ms/update)"
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmark of the OCR backends: easyocr with torch vs. ONNX Runtime (ONNXReader),
+on the rendered sample slides of bench_ocr_preprocess.py or a slide directory.
+
+Reports latency per slide, accuracy against the expected text and whether the
+ONNX output matches the torch output (same number of boxes and same text).
+
+    python benchmarks/bench_ocr_backend.py --threads 4
+    python benchmarks/bench_ocr_backend.py --quantize-int8 --slides path/to/slides
+"""
+import argparse
+import difflib
+import time
+
+from easyocr import Reader
+import torch
+
+from automixer.services.ocr_onnx import ONNXReader
+from bench_ocr_preprocess import load_slides, make_slides, normalize, ocr_text
+
+
+def measure(name, reader, slides, repeat):
+    # Load the models and warm up kernels before timing
+    reader.readtext(slides[0][0])
+    results = []
+    elapsed = 0.0
+    accuracy = 0.0
+    for slide, expected in slides:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            ocr_result = reader.readtext(slide)
+        elapsed += (time.perf_counter() - start) / repeat
+        accuracy += difflib.SequenceMatcher(None, normalize(expected), normalize(ocr_text(ocr_result))).ratio()
+        results.append(ocr_result)
+    n = len(slides)
+    print(f"{name:>12}: {elapsed / n * 1000:8.1f} ms/slide, accuracy {accuracy / n:6.3f}")
+    return results
+
+
+def compare(name, reference, results):
+    same = sum(
+        len(ref) == len(res) and [text for _, text, _ in ref] == [text for _, text, _ in res]
+        for ref, res in zip(reference, results)
+    )
+    print(f"{name:>12}: {same}/{len(reference)} slides with output identical to torch")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--slides", help="Directory of slide images with <name>.txt expected text")
+    parser.add_argument("--lang", nargs="+", default=["en"])
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--model-dir", default="~/.automixer/onnx")
+    parser.add_argument("--quantize-int8", action="store_true", help="Also benchmark the int8-quantized ONNX models")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    slides = load_slides(args.slides) if args.slides else make_slides(args.width, args.height)
+    if not slides:
+        parser.error("No slide images with expected text found")
+    if args.threads is not None:
+        torch.set_num_threads(args.threads)
+
+    reference = measure("torch", Reader(args.lang, gpu=False), slides, args.repeat)
+    results = measure(
+        "onnx",
+        ONNXReader(args.lang, model_dir=args.model_dir, threads=args.threads),
+        slides, args.repeat,
+    )
+    compare("onnx", reference, results)
+    if args.quantize_int8:
+        results = measure(
+            "onnx int8",
+            ONNXReader(args.lang, model_dir=args.model_dir, quantize_int8=True, threads=args.threads),
+            slides, args.repeat,
+        )
+        compare("onnx int8", reference, results)
+
+
+if __name__ == "__main__":
+    main()
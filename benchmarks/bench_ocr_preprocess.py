@@ -0,0 +1,125 @@
+"""
+Benchmark of OCR input preprocessing settings: latency and text accuracy of
+easyocr on sample slides.
+
+Sample slides are rendered with known text, or read from a directory of
+slide images each with a `<name>.txt` file holding its expected text.
+Accuracy is the similarity ratio (difflib) between expected and OCR-ed text.
+The downscale factor of each setting is estimated from the unprocessed OCR
+result of the slide, i.e. the steady state of a deck with consistent text size.
+
+    python benchmarks/bench_ocr_preprocess.py --width 1920 --height 1080
+    python benchmarks/bench_ocr_preprocess.py --slides path/to/slides
+"""
+import argparse
+import difflib
+from pathlib import Path
+import time
+
+import cv2
+from easyocr import Reader
+import numpy as np
+
+from automixer.services.ocr import OCRPreprocessor, readtext_frame
+
+
+SAMPLE_TEXT = [
+    ["Welcome", "Sunday Service"],
+    ["Amazing grace how sweet the sound", "That saved a wretch like me", "I once was lost but now am found"],
+    ["Announcements", "Youth camp registration closes on Friday", "Choir practice at 7 pm"],
+    ["Romans 8:28", "And we know that all things work together", "for good to them that love God"],
+]
+
+
+def make_slides(width, height):
+    slides = []
+    for i, lines in enumerate(SAMPLE_TEXT):
+        # Alternate light and dark themes
+        background, foreground = ((245, 245, 245), (20, 20, 20)) if i % 2 == 0 else ((40, 30, 20), (255, 255, 255))
+        slide = np.full((height, width, 3), background, dtype=np.uint8)
+        title_scale = height / 400
+        body_scale = height / 700
+        cv2.putText(
+            slide, lines[0], (width // 12, height // 5),
+            cv2.FONT_HERSHEY_SIMPLEX, title_scale, foreground, max(1, height // 300)
+        )
+        for j, line in enumerate(lines[1:]):
+            cv2.putText(
+                slide, line, (width // 12, height // 5 + (j + 1) * height // 8),
+                cv2.FONT_HERSHEY_SIMPLEX, body_scale, foreground, max(1, height // 500)
+            )
+        slides.append((slide, " ".join(lines)))
+    return slides
+
+
+def load_slides(directory):
+    slides = []
+    for path in sorted(Path(directory).iterdir()):
+        if path.suffix.lower() not in {".png", ".jpg", ".jpeg", ".bmp"}:
+            continue
+        text_path = path.with_suffix(".txt")
+        if not text_path.exists():
+            continue
+        slides.append((cv2.imread(str(path)), text_path.read_text(encoding="utf-8")))
+    return slides
+
+
+def normalize(text):
+    return " ".join(text.lower().split())
+
+
+def ocr_text(ocr_result):
+    return " ".join(text for _, text, _ in ocr_result)
+
+
+def measure(name, reader, slides, preprocessor):
+    elapsed = 0.0
+    accuracy = 0.0
+    scales = []
+    for slide, expected in slides:
+        if preprocessor is not None:
+            preprocessor.scale = 1.0
+            preprocessor.observe(reader.readtext(slide))
+            scales.append(preprocessor.scale)
+        start = time.perf_counter()
+        ocr_result = readtext_frame(reader, slide, preprocessor=preprocessor)
+        elapsed += time.perf_counter() - start
+        accuracy += difflib.SequenceMatcher(None, normalize(expected), normalize(ocr_text(ocr_result))).ratio()
+    n = len(slides)
+    scale = f"{np.mean(scales):.2f}" if scales else "1.00"
+    print(f"{name:>28}: {elapsed / n * 1000:8.1f} ms/slide, accuracy {accuracy / n:6.3f}, mean scale {scale}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--slides", help="Directory of slide images with <name>.txt expected text")
+    parser.add_argument("--lang", nargs="+", default=["en"])
+    parser.add_argument("--gpu", action="store_true")
+    args = parser.parse_args()
+
+    slides = load_slides(args.slides) if args.slides else make_slides(args.width, args.height)
+    if not slides:
+        parser.error("No slide images with expected text found")
+    reader = Reader(args.lang, gpu=args.gpu)
+    # Load the models before timing
+    reader.readtext(slides[0][0])
+
+    measure("raw", reader, slides, None)
+    measure("grayscale", reader, slides, OCRPreprocessor(target_text_height=None))
+    for target_text_height in (48, 32, 24):
+        measure(
+            f"grayscale+text height {target_text_height}",
+            reader, slides,
+            OCRPreprocessor(target_text_height=target_text_height, min_scale=0.25),
+        )
+    measure(
+        "grayscale+text height 32+otsu",
+        reader, slides,
+        OCRPreprocessor(target_text_height=32, min_scale=0.25, binarize=True),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -68,6 +68,14 @@ async def run_with_tui(config_path: str):
         root_logger.removeHandler(log_handler)
 
 
+def run_ingest_deck(config_path: str, deck_dir: str, output_path: str | None):
+    from automixer.ingest import ingest_deck
+
+    config = load_yaml(config_path)
+    automixer_config = AutomixerConfig.model_validate(config["mixer"])
+    ingest_deck(automixer_config, deck_dir, output_path)
+
+
 def resolve_log_file_path(log_dir: str | None, log_file: str | None) -> Path | None:
     """Resolve output log path from CLI flags and ensure parent directories exist."""
     if log_file:
@@ -105,13 +113,20 @@ def main():
     log_group = parser.add_mutually_exclusive_group()
     log_group.add_argument("--log-dir", type=str, help="Directory for log files; filename will use startup timestamp")
     log_group.add_argument("--log-file", type=str, help="Path to log file")
+    subparsers = parser.add_subparsers(dest="command")
+    ingest_parser = subparsers.add_parser("ingest-deck", help="OCR a slide deck ahead of time and build its index")
+    ingest_parser.add_argument("deck_dir", type=str, help="Directory of slide images (PNG/JPEG), one per slide")
+    ingest_parser.add_argument("-o", "--output", type=str, help="Path to the index file (defaults to OCR service deck_index.path)")
     args = parser.parse_args()
 
     load_dotenv()
     level = logging.DEBUG if args.verbose else logging.INFO
     log_file_path = resolve_log_file_path(args.log_dir, args.log_file)
 
-    if args.headless:
+    if args.command == "ingest-deck":
+        configure_logging(level, to_console=True, log_file_path=log_file_path)
+        run_ingest_deck(args.config, args.deck_dir, args.output)
+    elif args.headless:
         configure_logging(level, to_console=True, log_file_path=log_file_path)
         asyncio.run(run_headless(args.config))
     else:
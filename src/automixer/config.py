@@ -4,9 +4,11 @@ import inspect
 import cv2
 import easyocr
 from openai import OpenAI
-from pydantic import SecretStr, BaseModel, Field
+from pydantic import SecretStr, BaseModel, Field, model_validator
 import sounddevice as sd
 
+from automixer.core.frames import FrameStore
+from automixer.core.resources import ResourceGovernor, ThreadResources
 from automixer.services.transcription import OpenAITranscriber
 from automixer import services, interactors, Automixer
 
@@ -76,6 +78,10 @@ class OBSInteractorConfig(InstantiableClassConfig):
 class OCRReaderConfig(InstantiableThirdPartyClassConfig):
     _class: ClassVar[type] = easyocr.Reader
 
+    def get_lang_list(self) -> list[str]:
+        # easyocr.Reader does not keep the list it was created with
+        return list(self.model_dump().get("lang_list") or [])
+
 
 class OpenAIClientConfig(InstantiableThirdPartyClassConfig):
     _class: ClassVar[type] = OpenAI
@@ -127,12 +133,78 @@ class BaseServiceConfig(InstantiableClassConfig):
     pass  # For future common attributes
 
 
+class FrameStoreConfig(InstantiableClassConfig):
+    slots: int = 16
+    _class: ClassVar[type] = FrameStore
+
+
+class AdaptiveSamplerConfig(InstantiableClassConfig):
+    min_delay: float = 0.1
+    max_delay: float = 2.0
+    backoff: float = 1.5
+    static_time: float = 30.0
+    _class: ClassVar[type] = services.AdaptiveSampler
+
+
+class BaseFrameSourceConfig(InstantiableClassConfig):
+    speed: float = 1.0
+    loop: bool = False
+
+
+class VideoFileSourceConfig(BaseFrameSourceConfig):
+    source_type: Literal["video_file"] = "video_file"
+    path: str
+    fps: Optional[float] = None
+    _class: ClassVar[type] = services.VideoFileSource
+
+
+class ImageSequenceSourceConfig(BaseFrameSourceConfig):
+    source_type: Literal["image_sequence"] = "image_sequence"
+    directory: str
+    fps: float = 1.0
+    _class: ClassVar[type] = services.ImageSequenceSource
+
+
+class RawFrameDumpSourceConfig(BaseFrameSourceConfig):
+    source_type: Literal["raw_frame_dump"] = "raw_frame_dump"
+    path: str
+    width: int
+    height: int
+    channels: int = 3
+    fps: float = 30.0
+    _class: ClassVar[type] = services.RawFrameDumpSource
+
+
 class CameraServiceConfig(BaseServiceConfig):
     service_type: Literal["camera"] = "camera"
-    camera: CameraConfig
+    camera: Optional[CameraConfig] = None
+    source: Optional[Annotated[
+        Union[
+            VideoFileSourceConfig,
+            ImageSequenceSourceConfig,
+            RawFrameDumpSourceConfig,
+        ],
+        Field(discriminator="source_type")
+    ]] = None
     read_delay: Optional[float] = 0.1
+    grab_continuously: bool = True
+    frame_store: Optional[FrameStoreConfig] = None
+    sampler: Optional[AdaptiveSamplerConfig] = None
     _class: ClassVar[type] = services.CameraService
 
+    @model_validator(mode="after")
+    def check_single_source(self):
+        if (self.camera is None) == (self.source is None):
+            raise ValueError("Exactly one of 'camera' and 'source' must be provided")
+        return self
+
+    @classmethod
+    def filter_kwargs(cls, kwargs: dict) -> dict:
+        # A replay source stands in for the capture device
+        if kwargs.get("source") is not None:
+            kwargs["camera"] = kwargs["source"]
+        return super().filter_kwargs(kwargs)
+
 
 class InteractionServiceConfig(BaseServiceConfig):
     service_type: Literal["interaction"] = "interaction"
@@ -164,15 +236,26 @@ class ROUGELSlide2CamScorerConfig(BaseSlide2CamScorerConfig):
 class ROUGE1GramSlide2CamScorerConfig(BaseSlide2CamScorerConfig):
     scorer_type: Literal["rouge_1gram"] = "rouge_1gram"
     tolerance: int = 3
+    match_cache_size: int = 65536
+    implementation: Literal["python", "numpy"] = "python"
     _class: ClassVar[type] = services.ROUGE1GramSlide2CamScorer
 
 
+class ReadingPositionSlide2CamScorerConfig(BaseSlide2CamScorerConfig):
+    scorer_type: Literal["reading_position"] = "reading_position"
+    tolerance: int = 1
+    look_ahead: int = 3
+    match_cache_size: int = 65536
+    _class: ClassVar[type] = services.ReadingPositionSlide2CamScorer
+
+
 class WeightedScorerItemConfig(InstantiableClassConfig):
     weight: float
     scorer: Annotated[
         Union[
             ROUGELSlide2CamScorerConfig,
             ROUGE1GramSlide2CamScorerConfig,
+            ReadingPositionSlide2CamScorerConfig,
         ],
         Field(discriminator="scorer_type")
     ]
@@ -246,6 +329,7 @@ class MixingServiceConfig(BaseServiceConfig):
         Union[
             ROUGELSlide2CamScorerConfig,
             ROUGE1GramSlide2CamScorerConfig,
+            ReadingPositionSlide2CamScorerConfig,
             WeightedAverageSlide2CamScorerConfig,
         ],
         Field(discriminator="scorer_type")
@@ -263,12 +347,89 @@ class MixingServiceConfig(BaseServiceConfig):
     _class: ClassVar[type] = services.MixingService
 
 
+class OCRResultCacheConfig(InstantiableClassConfig):
+    max_size: int = 256
+    max_age: Optional[float] = None
+    max_distance: int = 3
+    _class: ClassVar[type] = services.OCRResultCache
+
+
+class OCRLayoutCacheConfig(OCRResultCacheConfig):
+    max_size: int = 64
+    max_distance: int = 1
+
+
+class OCRResultStoreConfig(InstantiableClassConfig):
+    path: str
+    max_entries: int = 10000
+    _class: ClassVar[type] = services.OCRResultStore
+
+
+class SlideDeckIndexConfig(InstantiableClassConfig):
+    path: str
+    max_distance: int = 3
+    # Filled in from the slide service
+    fingerprint_size: Optional[int] = None
+    _class: ClassVar[type] = services.SlideDeckIndex
+
+
+class OCRProcessPoolConfig(InstantiableClassConfig):
+    workers: int = 1
+    torch_threads: int = 1
+    _class: ClassVar[type] = services.OCRProcessPool
+
+
+class OCRPreprocessorConfig(InstantiableClassConfig):
+    grayscale: bool = True
+    target_text_height: Optional[int] = 32
+    min_scale: float = 0.5
+    text_height_percentile: float = 10
+    binarize: bool = False
+    _class: ClassVar[type] = services.OCRPreprocessor
+
+
+class ONNXReaderConfig(InstantiableClassConfig):
+    model_dir: str = "~/.automixer/onnx"
+    quantize_int8: bool = False
+    threads: Optional[int] = None
+    _class: ClassVar[type] = services.ONNXReader
+
+
 class OCRServiceConfig(BaseServiceConfig):
     service_type: Literal["ocr"] = "ocr"
     reader: OCRReaderConfig
+    onnx: Optional[ONNXReaderConfig] = None
     expect_frame_timeout: float = 5.0
+    cache: Optional[OCRResultCacheConfig] = None
+    store: Optional[OCRResultStoreConfig] = None
+    deck_index: Optional[SlideDeckIndexConfig] = None
+    process_pool: Optional[OCRProcessPoolConfig] = None
+    incremental_max_changed_fraction: float = 0.5
+    incremental_region_margin: int = 16
+    preprocessor: Optional[OCRPreprocessorConfig] = None
+    layout_cache: Optional[OCRLayoutCacheConfig] = None
+    layout_min_confidence: float = 0.5
     _class: ClassVar[type] = services.OCRService
 
+    @classmethod
+    def filter_kwargs(cls, kwargs: dict) -> dict:
+        onnx = kwargs.get("onnx")
+        kwargs = super().filter_kwargs(kwargs)
+        kwargs["lang_list"] = kwargs["reader"].get_lang_list()
+        onnx_kwargs = onnx.model_dump() if onnx is not None else None
+        process_pool = kwargs.get("process_pool")
+        if process_pool is not None:
+            # Reader is loaded by the worker processes instead of this one
+            kwargs["process_pool"] = process_pool.instantiate(
+                reader_kwargs=kwargs["reader"].model_dump(),
+                onnx_kwargs=onnx_kwargs,
+                **process_pool.model_dump(),
+            )
+            kwargs["reader"] = None
+        elif onnx is not None:
+            kwargs["reader"] = onnx.instantiate(**kwargs["reader"].model_dump(), **onnx_kwargs)
+        return kwargs
+
 
 class SlideServiceConfig(BaseServiceConfig):
     service_type: Literal["slide"] = "slide"
@@ -276,6 +437,23 @@ class SlideServiceConfig(BaseServiceConfig):
     edge_threshold: float
     full_black_threshold_mean: float
     full_black_threshold_std: float
+    pyramid_scales: List[float] = [0.25]
+    escalation_band_low: float = 0.5
+    escalation_band_high: float = 2.0
+    fingerprint_size: int = 16
+    validity_sample_stride: int = 4
+    placeholder_signature_width: int = 160
+    placeholder_signature_threshold: float = 0.6
+    settle_frames: int = 1
+    settle_time: float = 0.3
+    change_tile_size: int = 32
+    change_tile_threshold: float = 10
+    motion_window: int = 10
+    motion_enter_frames: int = 6
+    motion_exit_frames: int = 5
+    roi: Optional[tuple[int, int, int, int]] = None
+    auto_roi: bool = True
+    roi_black_threshold: int = 24
     _class: ClassVar[type] = services.SlideService
 
 
@@ -297,6 +475,21 @@ class NotificationServiceConfig(BaseServiceConfig):
     _class: ClassVar[type] = services.NotificationService
 
 
+class ThreadResourcesConfig(InstantiableClassConfig):
+    cpus: Optional[List[int]] = None
+    nice: Optional[int] = None
+    _class: ClassVar[type] = ThreadResources
+
+
+class ResourceGovernorConfig(InstantiableClassConfig):
+    torch_threads: Optional[int] = None
+    opencv_threads: Optional[int] = None
+    threads: dict[str, ThreadResourcesConfig] = {}
+    ocr_workers: Optional[ThreadResourcesConfig] = None
+    report_interval: Optional[float] = 300.0
+    _class: ClassVar[type] = ResourceGovernor
+
+
 class AutomixerConfig(InstantiableClassConfig):
     services: List[Annotated[
         Union[
@@ -311,8 +504,21 @@ class AutomixerConfig(InstantiableClassConfig):
         ],
         Field(discriminator="service_type")
     ]]
+    resources: Optional[ResourceGovernorConfig] = None
     _class: ClassVar[type] = Automixer
 
+    @model_validator(mode="after")
+    def link_deck_index_fingerprint_size(self):
+        # The deck index has to match the fingerprints of the slide service
+        slide_configs = [config for config in self.services if isinstance(config, SlideServiceConfig)]
+        for config in self.services:
+            if (isinstance(config, OCRServiceConfig)
+                    and config.deck_index is not None
+                    and config.deck_index.fingerprint_size is None
+                    and slide_configs):
+                config.deck_index.fingerprint_size = slide_configs[0].fingerprint_size
+        return self
+
 
 __all__ = [
     "InstantiableClassConfig",
@@ -325,12 +531,19 @@ __all__ = [
     "BaseNotifierConfig",
     "MQTTNotifierConfig",
     "BaseServiceConfig",
+    "FrameStoreConfig",
+    "AdaptiveSamplerConfig",
+    "BaseFrameSourceConfig",
+    "VideoFileSourceConfig",
+    "ImageSequenceSourceConfig",
+    "RawFrameDumpSourceConfig",
     "CameraServiceConfig",
     "InteractionServiceConfig",
     "MicServiceConfig",
     "BaseSlide2CamScorerConfig",
     "ROUGELSlide2CamScorerConfig",
     "ROUGE1GramSlide2CamScorerConfig",
+    "ReadingPositionSlide2CamScorerConfig",
     "WeightedScorerItemConfig",
     "WeightedAverageSlide2CamScorerConfig",
     "BaseSlide2CamJuryConfig",
@@ -339,10 +552,19 @@ __all__ = [
     "AndSlide2CamJuryConfig",
     "OrSlide2CamJuryConfig",
     "MixingServiceConfig",
+    "OCRResultCacheConfig",
+    "OCRLayoutCacheConfig",
+    "OCRResultStoreConfig",
+    "SlideDeckIndexConfig",
+    "OCRProcessPoolConfig",
+    "OCRPreprocessorConfig",
+    "ONNXReaderConfig",
     "OCRServiceConfig",
     "SlideServiceConfig",
     "TranscriptionServiceConfig",
     "NotificationServiceConfig",
+    "ThreadResourcesConfig",
+    "ResourceGovernorConfig",
     "AutomixerConfig",
     "preprocess_config",
 ]
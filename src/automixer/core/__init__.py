@@ -1,2 +1,4 @@
 from automixer.core.bus import *
 from automixer.core.events import *
+from automixer.core.frames import *
+from automixer.core.resources import *
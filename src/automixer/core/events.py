@@ -35,24 +35,54 @@ class SceneType(Enum):
 
 
 class CameraFrameEvent(BaseEvent):
-    SERIALIZE_INCLUDE: ClassVar[IncEx] = {"frame"}
+    SERIALIZE_INCLUDE: ClassVar[IncEx] = {"frame", "captured_at"}
     frame: Any
+    # Wall-clock time (time.time()) the frame was grabbed from the camera
+    captured_at: float | None = None
+
+
+# Region as (x, y, width, height) in frame pixels
+Region = tuple[int, int, int, int]
 
 
 class ValidCameraFrameEvent(CameraFrameEvent):
-    pass
+    fingerprint: int | None = None
+    # Slide content area of the frame, None for the whole frame
+    roi: Region | None = None
 
 
 class SlideChangeEvent(BaseEvent):
-    SERIALIZE_INCLUDE: ClassVar[IncEx] = {"slide", "previous_slide"}
+    SERIALIZE_INCLUDE: ClassVar[IncEx] = {"slide", "previous_slide", "fingerprint", "changed_regions", "roi"}
     slide: Any
     previous_slide: Any
+    fingerprint: int | None = None
+    changed_regions: list[Region] | None = None
+    roi: Region | None = None
+
+
+class SlideSettledEvent(BaseEvent):
+    SERIALIZE_INCLUDE: ClassVar[IncEx] = {
+        "slide", "fingerprint", "changed_regions", "previous_fingerprint", "roi"
+    }
+    slide: Any
+    fingerprint: int | None = None
+    # Changes relative to the previously settled slide
+    changed_regions: list[Region] | None = None
+    previous_fingerprint: int | None = None
+    roi: Region | None = None
+
+
+class MotionContentEvent(BaseEvent):
+    """Slide started or stopped showing sustained motion (embedded video, animation)."""
+    SERIALIZE_INCLUDE: ClassVar[IncEx] = {"in_motion"}
+    in_motion: bool
 
 
 class SlideOCREvent(BaseEvent):
-    SERIALIZE_INCLUDE: ClassVar[IncEx] = {"slide", "ocr_result"}
+    SERIALIZE_INCLUDE: ClassVar[IncEx] = {"slide", "ocr_result", "fingerprint"}
     slide: Any
     ocr_result: Any
+    fingerprint: int | None = None
 
 
 class AudioSegmentEvent(BaseEvent):
@@ -87,6 +117,13 @@ class TranscriptionStateEvent(BaseEvent):
     text: str
 
 
+class ReadingPositionEvent(BaseEvent):
+    """Number of slide words read so far, out of the total number of words on the slide."""
+    SERIALIZE_INCLUDE: ClassVar[IncEx] = {"position", "total"}
+    position: int
+    total: int
+
+
 def _get_all_event_classes() -> list[type[BaseEvent]]:
     event_classes = []
 
@@ -110,8 +147,11 @@ def get_event_class(name: str) -> type[BaseEvent] | None:
 __all__ = [
     "BaseEvent",
     "SceneType",
+    "Region",
     "CameraFrameEvent",
     "SlideChangeEvent",
+    "SlideSettledEvent",
+    "MotionContentEvent",
     "SlideOCREvent",
     "AudioSegmentEvent",
     "TranscriptionEvent",
@@ -119,5 +159,6 @@ __all__ = [
     "ProgramChangeEvent",
     "Slide2CamScoreEvent",
     "TranscriptionStateEvent",
+    "ReadingPositionEvent",
     "get_event_class",
 ]
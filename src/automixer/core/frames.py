@@ -0,0 +1,224 @@
+import asyncio
+from logging import getLogger
+from multiprocessing import resource_tracker, shared_memory
+import threading
+
+import numpy as np
+
+
+logger = getLogger(__name__)
+
+
+class StaleFrameError(RuntimeError):
+    """Raised when reading a frame handle whose slot has been reused."""
+
+
+class FrameHandle:
+    """
+    Lightweight reference to a frame held in a FrameStore slot.
+    Events carry handles instead of numpy frames; read the pixels with `array()`.
+    """
+    __slots__ = ("store", "slot", "generation", "shape", "dtype")
+
+    def __init__(self, store: "FrameStore", slot: int, generation: int, shape: tuple, dtype: np.dtype):
+        self.store = store
+        self.slot = slot
+        self.generation = generation
+        self.shape = shape
+        self.dtype = dtype
+
+    def array(self) -> np.ndarray:
+        """Zero-copy view of the frame."""
+        return self.store.view(self)
+
+    def retain(self) -> "FrameHandle":
+        self.store.retain(self)
+        return self
+
+    def release(self):
+        self.store.release(self)
+
+    def descriptor(self) -> tuple:
+        """Picklable (shm_name, offset, shape, dtype) to read the frame from another process."""
+        return (self.store.shm_name, self.slot * self.store.slot_size, self.shape, self.dtype.str)
+
+    def __repr__(self):
+        return f"FrameHandle(slot={self.slot}, generation={self.generation}, shape={self.shape})"
+
+
+class FrameStore:
+    """
+    Preallocated ring of shared memory frame slots with reference counting.
+    Frames are written once and read zero-copy through FrameHandle, also
+    from other processes, so frame memory is a fixed budget of `slots` frames.
+    """
+    def __init__(self, slots: int = 16):
+        self.slots = slots
+        self.slot_size = 0
+        self._shm = None
+        self._lock = threading.Lock()
+        self._refcounts = [0] * slots
+        self._generations = [0] * slots
+        self._cursor = 0
+        self.overflows = 0
+        # (reason, frame shape) already warned about, warnings would otherwise come at frame rate
+        self._warned = set()
+
+    @property
+    def shm_name(self) -> str | None:
+        return self._shm.name if self._shm is not None else None
+
+    def _allocate(self, slot_size: int):
+        self.slot_size = slot_size
+        self._shm = shared_memory.SharedMemory(create=True, size=slot_size * self.slots)
+        logger.info(
+            f"Allocated frame store of {self.slots} slots, "
+            f"{slot_size * self.slots / 1e6:.1f} MB in total"
+        )
+
+    def _find_free_slot(self) -> int | None:
+        for i in range(self.slots):
+            slot = (self._cursor + i) % self.slots
+            if self._refcounts[slot] == 0:
+                self._cursor = (slot + 1) % self.slots
+                return slot
+        return None
+
+    def write(self, frame: np.ndarray) -> "FrameHandle | np.ndarray":
+        """
+        Copy a frame into a free slot and return its handle, owning one reference.
+        Falls back to returning the frame itself if it does not fit or all
+        slots are in use.
+        """
+        with self._lock:
+            if self._shm is None:
+                self._allocate(frame.nbytes)
+            fits = frame.nbytes <= self.slot_size
+            slot = self._find_free_slot() if fits else None
+            if slot is None:
+                self.overflows += 1
+                reason = "no slot left" if fits else "frame larger than a slot"
+                if (reason, frame.shape) not in self._warned:
+                    self._warned.add((reason, frame.shape))
+                    logger.warning(
+                        f"Frame store has {reason} for {frame.shape} frames, passing them unmanaged "
+                        f"(further occurrences are only counted in overflows)"
+                    )
+                return frame
+            self._generations[slot] += 1
+            self._refcounts[slot] = 1
+            handle = FrameHandle(self, slot, self._generations[slot], frame.shape, frame.dtype)
+        self._slot_array(handle)[:] = frame
+        return handle
+
+    def _slot_array(self, handle: FrameHandle) -> np.ndarray:
+        return np.ndarray(
+            handle.shape,
+            dtype=handle.dtype,
+            buffer=self._shm.buf,
+            offset=handle.slot * self.slot_size,
+        )
+
+    def _check(self, handle: FrameHandle):
+        if self._generations[handle.slot] != handle.generation or self._refcounts[handle.slot] == 0:
+            raise StaleFrameError(f"{handle} is no longer held in the frame store")
+
+    def view(self, handle: FrameHandle) -> np.ndarray:
+        with self._lock:
+            self._check(handle)
+        return self._slot_array(handle)
+
+    def retain(self, handle: FrameHandle):
+        with self._lock:
+            self._check(handle)
+            self._refcounts[handle.slot] += 1
+
+    def release(self, handle: FrameHandle):
+        with self._lock:
+            if self._generations[handle.slot] != handle.generation:
+                return
+            self._refcounts[handle.slot] = max(0, self._refcounts[handle.slot] - 1)
+
+    def in_use(self) -> int:
+        with self._lock:
+            return sum(1 for count in self._refcounts if count > 0)
+
+    def close(self):
+        if self._shm is None:
+            return
+        try:
+            self._shm.close()
+        except BufferError:
+            # Views of the frames are still alive somewhere, let the GC close it
+            logger.warning("Frame store closed while frames are still referenced")
+        self._shm.unlink()
+        self._shm = None
+
+
+def as_array(frame) -> np.ndarray:
+    """Pixels of a frame given either as a numpy array or a FrameHandle."""
+    if isinstance(frame, FrameHandle):
+        return frame.array()
+    return frame
+
+
+def retain_frame(frame):
+    """Take a reference on a frame handle. No-op for plain arrays."""
+    if isinstance(frame, FrameHandle):
+        frame.retain()
+    return frame
+
+
+def release_frame(frame):
+    """Drop a reference on a frame handle. No-op for plain arrays and None."""
+    if isinstance(frame, FrameHandle):
+        frame.release()
+
+
+def release_after(event, *frames):
+    """
+    Keep frame handles carried by an event alive until all of its handlers
+    completed. Call right after dispatching the event.
+    """
+    handles = [retain_frame(frame) for frame in frames if isinstance(frame, FrameHandle)]
+    if not handles:
+        return
+
+    async def wait_and_release():
+        try:
+            await event
+        finally:
+            for handle in handles:
+                handle.release()
+
+    asyncio.get_running_loop().create_task(wait_and_release())
+
+
+# Segments attached by this process, by name
+_attached_segments: dict[str, shared_memory.SharedMemory] = {}
+
+
+def attach_frame(descriptor: tuple) -> np.ndarray:
+    """Read-only view of a frame from its FrameHandle.descriptor(), in another process."""
+    shm_name, offset, shape, dtype = descriptor
+    shm = _attached_segments.get(shm_name)
+    if shm is None:
+        shm = shared_memory.SharedMemory(name=shm_name)
+        # The owning process unlinks the segment, do not let this one track it
+        resource_tracker.unregister(shm._name, "shared_memory")
+        _attached_segments[shm_name] = shm
+    frame = np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)
+    frame.flags.writeable = False
+    return frame
+
+
+__all__ = [
+    "StaleFrameError",
+    "FrameHandle",
+    "FrameStore",
+    "as_array",
+    "retain_frame",
+    "release_frame",
+    "release_after",
+    "attach_frame",
+]
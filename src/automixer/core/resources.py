@@ -0,0 +1,142 @@
+from dataclasses import dataclass
+from logging import getLogger
+import os
+import threading
+import time
+
+
+logger = getLogger(__name__)
+
+
+def effective_allocation() -> dict:
+    """CPUs and niceness the calling thread actually runs with, where the platform tells."""
+    allocation = {}
+    if hasattr(os, "sched_getaffinity"):
+        allocation["cpus"] = sorted(os.sched_getaffinity(0))
+    if hasattr(os, "getpriority"):
+        allocation["nice"] = os.getpriority(os.PRIO_PROCESS, threading.get_native_id())
+    return allocation
+
+
+@dataclass
+class ThreadResources:
+    """CPU affinity and niceness of a service thread or worker process."""
+    cpus: list[int] | None = None
+    nice: int | None = None
+
+    def apply(self, name: str) -> dict:
+        """Apply to the calling thread and return its effective allocation."""
+        if self.cpus is not None:
+            try:
+                # On Linux, affinity and niceness are per thread, 0 being the calling one
+                os.sched_setaffinity(0, self.cpus)
+            except (AttributeError, OSError) as e:
+                logger.warning(f"Failed to set CPU affinity of {name}: {e}")
+        if self.nice is not None:
+            try:
+                os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), self.nice)
+            except (AttributeError, OSError) as e:
+                logger.warning(f"Failed to set priority of {name}: {e}")
+        allocation = effective_allocation()
+        logger.info(f"Resource allocation of {name}: {allocation}")
+        return allocation
+
+
+class ResourceGovernor:
+    """
+    Caps the threads of torch and OpenCV and pins service threads and OCR
+    worker processes to CPUs/priorities, so an OCR burst does not starve
+    capture threads and the event loop.
+    """
+    def __init__(
+        self,
+        torch_threads: int | None = None,
+        opencv_threads: int | None = None,
+        threads: dict[str, ThreadResources] | None = None,
+        ocr_workers: ThreadResources | None = None,
+        report_interval: float | None = 300.0,
+    ):
+        self.torch_threads = torch_threads
+        self.opencv_threads = opencv_threads
+        # Service name (e.g. "CameraService", or "main" for the event loop) -> resources
+        self.threads = threads or {}
+        self.ocr_workers = ocr_workers
+        self.report_interval = report_interval
+        # Effective allocation, by thread name
+        self.allocation = {}
+        self._services = []
+        self._last_reported_at = None
+
+    def default_resources(self) -> ThreadResources | None:
+        """
+        Allocation of the process before `main` is applied, for threads and
+        workers without an entry of their own, which would otherwise inherit
+        the one of `main` from the thread creating them.
+        """
+        main = self.threads.get("main")
+        if main is None:
+            return None
+        initial = effective_allocation()
+        return ThreadResources(
+            cpus=initial.get("cpus") if main.cpus is not None else None,
+            nice=initial.get("nice") if main.nice is not None else None,
+        )
+
+    def apply(self, services):
+        """
+        Set library threads and hand resources over to services, before they
+        start their threads and worker processes. `main` is applied later by
+        `apply_main`.
+        """
+        import cv2
+        import torch
+        if self.torch_threads is not None:
+            torch.set_num_threads(self.torch_threads)
+        if self.opencv_threads is not None:
+            cv2.setNumThreads(self.opencv_threads)
+        self.allocation["torch_threads"] = torch.get_num_threads()
+        self.allocation["opencv_threads"] = cv2.getNumThreads()
+        logger.info(
+            f"Library threads: torch {self.allocation['torch_threads']}, "
+            f"OpenCV {self.allocation['opencv_threads']}"
+        )
+
+        default = self.default_resources()
+        self._services = list(services)
+        for service in self._services:
+            name = getattr(service, "service_name", type(service).__name__)
+            if hasattr(service, "thread_resources"):
+                # Applied from within the service thread once started
+                service.thread_resources = self.threads.get(name, default)
+            process_pool = getattr(service, "process_pool", None)
+            if process_pool is not None:
+                process_pool.worker_resources = self.ocr_workers or default
+
+    def apply_main(self):
+        """Apply `main` to the calling (event loop) thread, once services are up, and log the allocation."""
+        if "main" in self.threads:
+            self.allocation["main"] = self.threads["main"].apply("main")
+        self.log_report()
+
+    def log_report(self):
+        self._last_reported_at = time.monotonic()
+        logger.info(f"Resource allocation: {self.report()}")
+
+    def maybe_report(self):
+        """Log the effective allocation at most once per `report_interval` seconds."""
+        if self.report_interval is None or self._last_reported_at is None:
+            return
+        if time.monotonic() - self._last_reported_at >= self.report_interval:
+            self.log_report()
+
+    def report(self) -> dict:
+        """Effective allocation, including the service threads started since `apply`."""
+        report = dict(self.allocation)
+        for service in self._services:
+            allocation = getattr(service, "thread_allocation", None)
+            if allocation is not None:
+                report[service.service_name] = allocation
+        return report
+
+
+__all__ = ["ThreadResources", "ResourceGovernor", "effective_allocation"]
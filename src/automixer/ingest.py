@@ -0,0 +1,85 @@
+from logging import getLogger
+from pathlib import Path
+
+import cv2
+
+from automixer.builder import build_from_config
+from automixer.config import AutomixerConfig, OCRServiceConfig, SlideServiceConfig
+from automixer.services.ocr import OCRResultStore, SlideDeckIndex
+from automixer.utils.vision import dhash, downscale_gray
+
+
+logger = getLogger(__name__)
+
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".bmp"}
+
+
+def find_service_config(config: AutomixerConfig, config_type: type):
+    for service_config in config.services:
+        if isinstance(service_config, config_type):
+            return service_config
+    return None
+
+
+def list_slide_images(deck_dir: str) -> list[Path]:
+    """List slide images in a directory, sorted by file name."""
+    return sorted(
+        path for path in Path(deck_dir).iterdir()
+        if path.suffix.lower() in IMAGE_EXTENSIONS
+    )
+
+
+def ingest_deck(
+    config: AutomixerConfig,
+    deck_dir: str,
+    output_path: str | None = None,
+) -> SlideDeckIndex:
+    """
+    OCR every slide image in `deck_dir` with the configured reader and
+    save a fingerprint to OCR result index used by `OCRService` at runtime.
+    """
+    ocr_config = find_service_config(config, OCRServiceConfig)
+    if ocr_config is None:
+        raise ValueError("No OCR service found in configuration")
+    slide_config = find_service_config(config, SlideServiceConfig)
+    if slide_config is None:
+        raise ValueError("No slide service found in configuration")
+
+    if output_path is None:
+        if ocr_config.deck_index is None:
+            raise ValueError("No output path given and OCR service has no deck_index configured")
+        output_path = ocr_config.deck_index.path
+
+    # Fingerprint the same way SlideService does, from the coarsest pyramid level
+    scale = min(slide_config.pyramid_scales, default=1.0)
+    fingerprint_size = slide_config.fingerprint_size
+
+    reader = build_from_config(ocr_config.reader)
+    index = SlideDeckIndex(output_path)
+    index.fingerprint_size = fingerprint_size
+    # Same key as OCRService, from the configured languages
+    index.lang_key = OCRResultStore.make_lang_key(ocr_config.reader.get_lang_list())
+
+    image_paths = list_slide_images(deck_dir)
+    if not image_paths:
+        raise ValueError(f"No slide images found in {deck_dir}")
+
+    for i, image_path in enumerate(image_paths, 1):
+        image = cv2.imread(str(image_path))
+        if image is None:
+            logger.warning(f"Failed to read slide image {image_path}, skipped")
+            continue
+        fingerprint = dhash(downscale_gray(image, scale), fingerprint_size)
+        ocr_result = reader.readtext(image)
+        index.add(fingerprint, image_path.name, ocr_result)
+        logger.info(f"[{i}/{len(image_paths)}] Ingested {image_path.name}")
+
+    index.save()
+    logger.info(f"Saved slide deck index with {len(index)} slides to {output_path}")
+    return index
+
+
+__all__ = [
+    "ingest_deck",
+    "list_slide_images",
+]
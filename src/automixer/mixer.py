@@ -3,6 +3,7 @@ import asyncio
 from typing import List
 
 from automixer import EventBus
+from automixer.core.resources import ResourceGovernor
 from automixer.services.base import BaseService
 
 
@@ -13,7 +14,8 @@ class Automixer:
     def __init__(
         self,
         bus: EventBus,
-        services: List[BaseService]
+        services: List[BaseService],
+        resources: ResourceGovernor | None = None,
     ):
         for service in services:
             if not isinstance(service, BaseService):
@@ -21,6 +23,7 @@ class Automixer:
 
         self.bus = bus
         self.services = services
+        self.resources = resources
         self._should_pause = False
 
     def pause(self):
@@ -46,10 +49,18 @@ class Automixer:
 
     async def start(self):
         logger.info("Starting Automixer...")
+        if self.resources is not None:
+            # Before services start their threads and worker processes
+            self.resources.apply(self.services)
         self.bus._start()
         await asyncio.gather(*[service.up() for service in self.services])
+        if self.resources is not None:
+            # Last, so threads and worker processes started above do not inherit it
+            self.resources.apply_main()
 
     async def step(self):
+        if self.resources is not None:
+            self.resources.maybe_report()
         await asyncio.gather(
             asyncio.gather(*[service.step() for service in self.services]),
             self.bus.step()
@@ -111,6 +111,9 @@ class ThreadService(BaseService):
         self._should_stop = False
         self._should_pause = False
         self._thread = None
+        # CPU affinity/priority applied to the service thread, set by the resource governor
+        self.thread_resources = None
+        self.thread_allocation = None
         if self.SERVICE_NAME is None:
             self.service_name = self.__class__.__name__
         else:
@@ -126,6 +129,11 @@ class ThreadService(BaseService):
         raise NotImplementedError(
             "ThreadedService subclasses must implement run()")
 
+    def _run_thread(self):
+        if self.thread_resources is not None:
+            self.thread_allocation = self.thread_resources.apply(self.service_name)
+        self.run()
+
     def is_alive(self):
         return (self._thread is not None) and self._thread.is_alive()
 
@@ -133,7 +141,7 @@ class ThreadService(BaseService):
         if self.is_alive():
             return
         self._should_stop = False
-        self._thread = threading.Thread(target=self.run)
+        self._thread = threading.Thread(target=self._run_thread)
         self._thread.start()
         logger.info(f"{self.service_name} started")
 
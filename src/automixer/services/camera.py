@@ -1,50 +1,391 @@
+from abc import ABC, abstractmethod
 from logging import getLogger
-from queue import Queue
+from pathlib import Path
+import threading
 import time
-from automixer.core.events import CameraFrameEvent
-from automixer.services.base import ThreadService
+from automixer.core.events import (
+    CameraFrameEvent,
+    ProgramChangeEvent,
+    SceneType,
+    SlideChangeEvent,
+)
+from automixer.core.frames import FrameStore, release_after, release_frame
+from automixer.services.base import ThreadService, autoregister
+from automixer.utils.stats import StatCounters
 import cv2
+import numpy as np
 
 
 logger = getLogger(__name__)
 
 
+class LatestFrameSlot:
+    """Single-slot, latest-wins hand-off of frames between threads."""
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._item = None
+
+    def put(self, frame, captured_at: float):
+        """Store a frame, return the undelivered (frame, captured_at) it replaced, if any."""
+        with self._condition:
+            replaced, self._item = self._item, (frame, captured_at)
+        return replaced
+
+    def take(self):
+        """Return (frame, captured_at) and empty the slot, or None if empty."""
+        with self._condition:
+            item, self._item = self._item, None
+            self._condition.notify_all()
+        return item
+
+    def is_empty(self) -> bool:
+        with self._condition:
+            return self._item is None
+
+    def wait_empty(self, timeout: float | None = None) -> bool:
+        """Wait until the frame is taken, return True if the slot is empty."""
+        with self._condition:
+            return self._condition.wait_for(lambda: self._item is None, timeout)
+
+    def clear(self):
+        with self._condition:
+            item, self._item = self._item, None
+            self._condition.notify_all()
+        if item is not None:
+            release_frame(item[0])
+
+
+class AdaptiveSampler:
+    """
+    Read delay that drops to min_delay right after a slide change and stays
+    there while the program is on a slide or camera scene, and otherwise
+    (other scenes, or no slide change for static_time seconds on camera)
+    grows by backoff after every sampled frame, up to max_delay.
+    """
+    def __init__(
+        self,
+        min_delay: float = 0.1,
+        max_delay: float = 2.0,
+        backoff: float = 1.5,
+        static_time: float = 30.0,
+    ):
+        if not 0 < min_delay <= max_delay:
+            raise ValueError("Expected 0 < min_delay <= max_delay")
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.backoff = backoff
+        self.static_time = static_time
+        self.delay = min_delay
+        self.scene_type: SceneType | None = None
+        self._changed_at = time.monotonic()
+
+    def boost(self):
+        self.delay = self.min_delay
+        self._changed_at = time.monotonic()
+
+    def set_scene(self, scene_type: SceneType):
+        self.scene_type = scene_type
+        if scene_type in (SceneType.SLIDE, SceneType.CAMERA):
+            self.boost()
+
+    def sampled(self):
+        """Back off after a sampled frame, unless on slide, or on camera with recent slide changes."""
+        if self.scene_type is SceneType.SLIDE:
+            return
+        if (self.scene_type is SceneType.CAMERA
+                and time.monotonic() - self._changed_at < self.static_time):
+            # A change back to the slide has to be caught quickly
+            return
+        self.delay = min(self.delay * self.backoff, self.max_delay)
+
+
+class FrameSource(ABC):
+    """
+    Replayable stand-in for cv2.VideoCapture (grab/retrieve/read/release),
+    paced against the source frame rate. A speed of 2.0 replays twice as fast
+    as real time, a speed of 0 replays as fast as possible.
+    """
+    def __init__(self, fps: float = 30.0, speed: float = 1.0, loop: bool = False):
+        self.fps = fps
+        self.speed = speed
+        self.loop = loop
+        self._grabbed = 0
+        self._started_at = None
+
+    @abstractmethod
+    def _advance(self) -> bool:
+        """Move to the next frame (rewinding if looping), return False at the end."""
+
+    @abstractmethod
+    def _retrieve(self) -> np.ndarray | None:
+        """Decode the current frame."""
+
+    def _pace(self):
+        if not self.speed:
+            return
+        now = time.monotonic()
+        if self._started_at is None:
+            self._started_at = now
+        due_at = self._started_at + self._grabbed / self.fps / self.speed
+        if due_at > now:
+            time.sleep(due_at - now)
+
+    def grab(self) -> bool:
+        if not self._advance():
+            return False
+        self._pace()
+        self._grabbed += 1
+        return True
+
+    def retrieve(self):
+        frame = self._retrieve()
+        return frame is not None, frame
+
+    def read(self):
+        if not self.grab():
+            return False, None
+        return self.retrieve()
+
+    def release(self):
+        pass
+
+
+class VideoFileSource(FrameSource):
+    """Frames of a video file. Frame rate defaults to the one of the file."""
+
+    def __init__(self, path: str, fps: float | None = None, speed: float = 1.0, loop: bool = False):
+        self._capture = cv2.VideoCapture(path)
+        if not self._capture.isOpened():
+            raise ValueError(f"Failed to open video file {path}")
+        if fps is None:
+            fps = self._capture.get(cv2.CAP_PROP_FPS) or 30.0
+        super().__init__(fps=fps, speed=speed, loop=loop)
+
+    def _advance(self) -> bool:
+        if self._capture.grab():
+            return True
+        if not self.loop:
+            return False
+        self._capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+        return self._capture.grab()
+
+    def _retrieve(self) -> np.ndarray | None:
+        ret, frame = self._capture.retrieve()
+        return frame if ret else None
+
+    def release(self):
+        self._capture.release()
+
+
+class ImageSequenceSource(FrameSource):
+    """Image files of a directory, in file name order."""
+    IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".bmp"}
+
+    def __init__(self, directory: str, fps: float = 1.0, speed: float = 1.0, loop: bool = False):
+        super().__init__(fps=fps, speed=speed, loop=loop)
+        self._paths = sorted(
+            path for path in Path(directory).iterdir()
+            if path.suffix.lower() in self.IMAGE_EXTENSIONS
+        )
+        if not self._paths:
+            raise ValueError(f"No images found in {directory}")
+        self._index = -1
+
+    def _advance(self) -> bool:
+        self._index += 1
+        if self._index >= len(self._paths):
+            if not self.loop:
+                return False
+            self._index = 0
+        return True
+
+    def _retrieve(self) -> np.ndarray | None:
+        return cv2.imread(str(self._paths[self._index]))
+
+
+class RawFrameDumpSource(FrameSource):
+    """
+    Memory-mapped file of concatenated raw 8-bit frames (e.g. BGR24 written by
+    `ffmpeg -f rawvideo -pix_fmt bgr24`). Frames are read without decoding.
+    """
+    def __init__(
+        self,
+        path: str,
+        width: int,
+        height: int,
+        channels: int = 3,
+        fps: float = 30.0,
+        speed: float = 1.0,
+        loop: bool = False,
+    ):
+        super().__init__(fps=fps, speed=speed, loop=loop)
+        frame_size = width * height * channels
+        data = np.memmap(path, dtype=np.uint8, mode="r")
+        n_frames = len(data) // frame_size
+        if n_frames == 0:
+            raise ValueError(f"Raw frame dump {path} holds no complete {width}x{height} frame")
+        self._frames = data[:n_frames * frame_size].reshape(n_frames, height, width, channels)
+        self._index = -1
+
+    def _advance(self) -> bool:
+        self._index += 1
+        if self._index >= len(self._frames):
+            if not self.loop:
+                return False
+            self._index = 0
+        return True
+
+    def _retrieve(self) -> np.ndarray | None:
+        return self._frames[self._index]
+
+    def release(self):
+        self._frames = None
+
+
 class CameraService(ThreadService):
     def __init__(
         self,
         bus,
-        camera: cv2.VideoCapture,
-        read_delay: float = 0.1
+        camera: cv2.VideoCapture | FrameSource,
+        read_delay: float = 0.1,
+        grab_continuously: bool = True,
+        frame_store: FrameStore | None = None,
+        sampler: AdaptiveSampler | None = None,
     ):
         super().__init__(bus)
         self.camera = camera
         self.read_delay = read_delay
-        self._camera_frame_queue = Queue()
+        self.grab_continuously = grab_continuously
+        # When set, frames are written once into shared memory and events carry handles
+        self.frame_store = frame_store
+        # When set, replaces the fixed read_delay
+        self.sampler = sampler
+        self._frame_slot = LatestFrameSlot()
+        self.capture_stats = StatCounters("Camera capture")
 
     def run(self):
+        if isinstance(self.camera, FrameSource):
+            self._run_replay()
+        elif self.grab_continuously:
+            self._run_grab()
+        else:
+            self._run_read()
+
+    def _run_replay(self):
+        # Replays are paced by the source speed and the consumer, not by read_delay,
+        # and the next frame is only read once the previous one is taken, so none is dropped
+        while not self.should_stop():
+            if self.should_pause():
+                time.sleep(0.05)
+                continue
+            if not self._frame_slot.wait_empty(timeout=0.05):
+                continue
+            ret, frame = self.camera.read()
+            if not ret:
+                logger.info("Frame source ended.")
+                return
+            self._put_frame(frame, time.time())
+
+    def _run_read(self):
         while not self.should_stop():
             if self.should_pause():
+                time.sleep(0.05)
                 continue
             ret, frame = self.camera.read()
             if not ret:
                 logger.warning("Failed to read frame from camera.")
                 return
-            self._camera_frame_queue.put(frame)
-            time.sleep(self.read_delay)
+            read_at = time.monotonic()
+            self._put_frame(frame, time.time())
+            while not self.should_stop() and time.monotonic() - read_at < self.current_read_delay():
+                # Sleep in short steps so a boosted sampler takes effect right away
+                time.sleep(min(0.05, self.current_read_delay()))
+
+    def _run_grab(self):
+        # Grab every frame to keep the device buffer fresh, but only decode
+        # one every read_delay, and only once the previous one was taken
+        last_retrieved_at = 0.0
+        while not self.should_stop():
+            if self.should_pause():
+                time.sleep(0.05)
+                continue
+            if not self.camera.grab():
+                logger.warning("Failed to grab frame from camera.")
+                return
+            grabbed_at = time.time()
+            self.capture_stats.inc("grabbed")
+            if time.monotonic() - last_retrieved_at < self.current_read_delay():
+                continue
+            if not self._frame_slot.is_empty():
+                # Decoding now would only overwrite a frame not yet dispatched
+                self.capture_stats.inc("retrieve_deferred")
+                continue
+            ret, frame = self.camera.retrieve()
+            if not ret:
+                logger.warning("Failed to retrieve frame from camera.")
+                return
+            last_retrieved_at = time.monotonic()
+            self._put_frame(frame, grabbed_at)
+
+    def current_read_delay(self) -> float:
+        if self.sampler is None:
+            return self.read_delay
+        return self.sampler.delay
+
+    def _put_frame(self, frame, captured_at: float):
+        self.capture_stats.inc("retrieved")
+        if self.sampler is not None:
+            self.sampler.sampled()
+            self.capture_stats.set("read_delay", self.sampler.delay)
+        if self.frame_store is not None:
+            frame = self.frame_store.write(frame)
+        replaced = self._frame_slot.put(frame, captured_at)
+        if replaced is not None:
+            # Consumer did not keep up, the older frame is never dispatched
+            release_frame(replaced[0])
+            self.capture_stats.inc("dropped")
+
+    @autoregister
+    def on_slide_change(self, event: SlideChangeEvent):
+        if self.sampler is not None:
+            self.sampler.boost()
+
+    @autoregister
+    def on_program_change(self, event: ProgramChangeEvent):
+        if self.sampler is not None:
+            self.sampler.set_scene(event.scene_type)
 
     async def up(self):
         self.start()
 
     async def step(self):
-        if self._camera_frame_queue.empty():
+        self.capture_stats.maybe_log(logger)
+        item = self._frame_slot.take()
+        if item is None:
             return
-        frame = self._camera_frame_queue.get()
-        event = CameraFrameEvent(frame=frame)
+        frame, captured_at = item
+        self.capture_stats.inc("dispatched")
+        self.capture_stats.set("frame_age", time.time() - captured_at)
+        event = CameraFrameEvent(frame=frame, captured_at=captured_at)
         self.bus.dispatch(event)
+        release_after(event, frame)
+        # The capture reference is handed over to the event
+        release_frame(frame)
 
     async def down(self):
         await super().down()
+        self._frame_slot.clear()
         self.camera.release()
+        if self.frame_store is not None:
+            self.frame_store.close()
 
 
-__all__ = ["CameraService"]
+__all__ = [
+    "AdaptiveSampler",
+    "FrameSource",
+    "VideoFileSource",
+    "ImageSequenceSource",
+    "RawFrameDumpSource",
+    "CameraService",
+]
@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+import string
 import time
 from logging import getLogger
 from automixer.core.events import (
@@ -8,11 +9,18 @@ from automixer.core.events import (
     SlideChangeEvent,
     SlideOCREvent,
     ProgramChangeEvent,
+    ReadingPositionEvent,
     TranscriptionEvent,
     TranscriptionStateEvent
 )
 from automixer.services.base import BaseService, autoregister
-from automixer.utils.text import lcs, lcs_1gram
+from automixer.utils.text import (
+    BitParallelLCS,
+    IncrementalLCS1Gram,
+    ReadingCursor,
+    VectorizedLCS1Gram,
+    WordMatcher,
+)
 from automixer.core.bus import EventBus
 
 
@@ -24,28 +32,147 @@ class BaseSlide2CamScorer(ABC):
     def score(self, slide_text: str, transcription: str) -> float:
         """Calculate a score indicating how well the transcription matches the slide text."""
 
+    def reset(self):
+        """Drop state kept between calls, e.g. when the slide or the program changes."""
+
+    def reading_position(self) -> tuple[int, int] | None:
+        """(Slide words read, slide words) as of the last score, for scorers following the speaker."""
+        return None
+
 
 class ROUGELSlide2CamScorer(BaseSlide2CamScorer):
+    # Trailing characters MixingService strips off the transcription before appending to it
+    RETRACTABLE_CHARS = "."
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self._slide_text = None
+        self._lcs = None
+        # Transcription prefix the LCS state was extended with
+        self._committed = ""
+
     def score(self, slide_text: str, transcription: str) -> float:
-        lcs_length, _ = lcs(slide_text, transcription)
+        if slide_text != self._slide_text:
+            self._slide_text = slide_text
+            self._lcs = BitParallelLCS(slide_text)
+            self._committed = ""
+        if not transcription.startswith(self._committed):
+            self._lcs.reset()
+            self._committed = ""
+        # Only extend the state with text the next transcription will still start with
+        stable = transcription.rstrip(self.RETRACTABLE_CHARS)
+        self._lcs.extend(stable[len(self._committed):])
+        self._committed = stable
+        lcs_length = self._lcs.peek(transcription[len(stable):])
         rouge_l = lcs_length / len(slide_text)
         return rouge_l
 
 
 class ROUGE1GramSlide2CamScorer(BaseSlide2CamScorer):
-    def __init__(self, tolerance: int = 3):
+    IMPLEMENTATIONS = {
+        "python": IncrementalLCS1Gram,
+        "numpy": VectorizedLCS1Gram,
+    }
+
+    def __init__(self, tolerance: int = 3, match_cache_size: int = 65536, implementation: str = "python"):
+        if implementation not in self.IMPLEMENTATIONS:
+            raise ValueError(f"Unknown 1-gram LCS implementation: {implementation}")
         self.tolerance = tolerance
+        self.implementation = implementation
+        # Outlives slides, word pairs recur across slides and updates
+        self.matcher = WordMatcher(tolerance, match_cache_size)
+        self.reset()
+
+    def reset(self):
+        self._slide_text = None
+        self._lcs = None
 
     def score(self, slide_text: str, transcription: str) -> float:
-        lcs_length, lcs_result = lcs_1gram(
-            slide_text.split(),
-            transcription.split(),
-            self.tolerance
-        )
+        if slide_text != self._slide_text:
+            self._slide_text = slide_text
+            # The previous engine and its word IDs are dropped
+            self.matcher.trim()
+            engine_class = self.IMPLEMENTATIONS[self.implementation]
+            self._lcs = engine_class(slide_text.split(), self.tolerance, self.matcher)
+        self._lcs.update(transcription.split())
+        lcs_length, lcs_result = self._lcs.result()
         rouge_1gram = len(" ".join(lcs_result)) / len(slide_text)
         return rouge_1gram
 
 
+class ReadingPositionSlide2CamScorer(BaseSlide2CamScorer):
+    """
+    Fraction of the slide words read so far, from a cursor following the
+    transcription through the slide words. Only the words added since the
+    last call are matched, the last word once it can no longer change.
+    """
+    # Stripped off words, so punctuation doesn't keep the cursor from matching
+    PUNCTUATION = string.punctuation
+
+    def __init__(self, tolerance: int = 1, look_ahead: int = 3, match_cache_size: int = 65536):
+        self.tolerance = tolerance
+        self.look_ahead = look_ahead
+        # Outlives slides, word pairs recur across slides and updates
+        self.matcher = WordMatcher(tolerance, match_cache_size)
+        self.reset()
+
+    def reset(self):
+        self._slide_text = None
+        self._cursor = None
+        # Transcription prefix, up to a word boundary, the cursor was advanced with
+        self._committed = ""
+        self._position = 0
+
+    @classmethod
+    def normalize_word(cls, token: str) -> str:
+        """Word a token is matched as, empty for tokens without letters or digits ("...", "-")."""
+        if not any(char.isalnum() for char in token):
+            return ""
+        return token.strip(cls.PUNCTUATION)
+
+    @classmethod
+    def words(cls, text: str) -> list[str]:
+        """Words followed by the cursor, tokens without letters or digits are skipped."""
+        return [word for word in map(cls.normalize_word, text.split()) if word]
+
+    @classmethod
+    def read_token_count(cls, slide_text: str, position: int) -> int:
+        """Number of whitespace-separated tokens of slide_text up to the cursor at position."""
+        tokens = slide_text.split()
+        count = read = 0
+        while count < len(tokens) and read < position:
+            if cls.normalize_word(tokens[count]):
+                read += 1
+            count += 1
+        return count
+
+    def score(self, slide_text: str, transcription: str) -> float:
+        if slide_text != self._slide_text:
+            self._slide_text = slide_text
+            # The previous cursor and its word IDs are dropped
+            self.matcher.trim()
+            self._cursor = ReadingCursor(self.words(slide_text), self.tolerance, self.look_ahead, self.matcher)
+            self._committed = ""
+        if not transcription.startswith(self._committed):
+            self._cursor.reset()
+            self._committed = ""
+        # MixingService may strip trailing dots off the last word before appending to it
+        stable = transcription[:transcription.rfind(" ") + 1]
+        self._cursor.extend(self.words(stable[len(self._committed):]))
+        self._committed = stable
+        self._position = self._cursor.peek(self.words(transcription[len(stable):]))
+        if not self._cursor.seq:
+            return 0.0
+        return self._position / len(self._cursor.seq)
+
+    def reading_position(self) -> tuple[int, int] | None:
+        if self._cursor is None:
+            return None
+        return self._position, len(self._cursor.seq)
+
+
 class WeightedAverageSlide2CamScorer(BaseSlide2CamScorer):
     def __init__(
         self,
@@ -64,6 +191,17 @@ class WeightedAverageSlide2CamScorer(BaseSlide2CamScorer):
         total_weight = sum(item["weight"] for item in self.weight_scorer_set)
         return total_score / total_weight
 
+    def reset(self):
+        for item in self.weight_scorer_set:
+            item["scorer"].reset()
+
+    def reading_position(self) -> tuple[int, int] | None:
+        for item in self.weight_scorer_set:
+            position = item["scorer"].reading_position()
+            if position is not None:
+                return position
+        return None
+
 
 class BaseSlide2CamJury(ABC):
     @abstractmethod
@@ -150,6 +288,7 @@ class MixingService(BaseService):
         slide_text = " ".join([elem[1] for elem in ocr_result]).lower()
         self.slide_text = slide_text
         logger.debug(f"Updated slide text: {self.slide_text}")
+        self.slide2cam_scorer.reset()
         self.update_slide2cam_score()
 
     @autoregister
@@ -172,6 +311,7 @@ class MixingService(BaseService):
             self.transcription = None
             self.score_sequence = []
             self._threshold_crossed_at = None
+            self.slide2cam_scorer.reset()
 
     def calculate_slide2cam_score(self):
         if not self.slide_text or not self.transcription:
@@ -184,6 +324,10 @@ class MixingService(BaseService):
         self._last_score = self.calculate_slide2cam_score()
         self.score_sequence.append(self._last_score)
         self.bus.dispatch(Slide2CamScoreEvent(score=self._last_score))
+        reading_position = self.slide2cam_scorer.reading_position()
+        if reading_position is not None:
+            position, total = reading_position
+            self.bus.dispatch(ReadingPositionEvent(position=position, total=total))
         if not self.slide2cam_jury.decide(self.score_sequence):
             self._threshold_crossed_at = None
             return
@@ -202,6 +346,7 @@ __all__ = [
     "BaseSlide2CamScorer",
     "ROUGELSlide2CamScorer",
     "ROUGE1GramSlide2CamScorer",
+    "ReadingPositionSlide2CamScorer",
     "WeightedAverageSlide2CamScorer",
     "BaseSlide2CamJury",
     "ThresholdSlide2CamJury",
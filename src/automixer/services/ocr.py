@@ -1,52 +1,968 @@
 import asyncio
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+import json
 from logging import getLogger
+import multiprocessing
+from multiprocessing import resource_tracker, shared_memory
+from pathlib import Path
 from queue import Queue
+import sqlite3
+import threading
+import time
+import cv2
 from easyocr import Reader
+import numpy as np
 from automixer.core.events import (
     ProgramChangeEvent,
-    SlideChangeEvent,
+    Region,
     SlideOCREvent,
+    SlideSettledEvent,
     ValidCameraFrameEvent,
     SceneType
 )
+from automixer.core.frames import (
+    FrameHandle, StaleFrameError, as_array, attach_frame, release_after, release_frame, retain_frame
+)
+from automixer.core.resources import ThreadResources
 from automixer.services.base import ThreadService, autoregister
+from automixer.utils.stats import StatCounters
+from automixer.utils.vision import hamming_distance, layout_fingerprint
 
 
 logger = getLogger(__name__)
 
 
+def ocr_result_to_jsonable(ocr_result) -> list:
+    """Convert a `readtext` result (possibly holding numpy scalars) to plain lists."""
+    return [
+        [[[float(x), float(y)] for x, y in box], str(text), float(confidence)]
+        for box, text, confidence in ocr_result
+    ]
+
+
+def ocr_result_from_jsonable(data: list) -> list:
+    return [(box, text, confidence) for box, text, confidence in data]
+
+
+def box_to_region(box) -> Region:
+    xs = [point[0] for point in box]
+    ys = [point[1] for point in box]
+    return (int(min(xs)), int(min(ys)), int(max(xs) - min(xs)), int(max(ys) - min(ys)))
+
+
+def regions_intersect(a: Region, b: Region) -> bool:
+    return (a[0] < b[0] + b[2] and b[0] < a[0] + a[2]
+            and a[1] < b[1] + b[3] and b[1] < a[1] + a[3])
+
+
+def union_region(a: Region, b: Region) -> Region:
+    x0, y0 = min(a[0], b[0]), min(a[1], b[1])
+    x1, y1 = max(a[0] + a[2], b[0] + b[2]), max(a[1] + a[3], b[1] + b[3])
+    return (x0, y0, x1 - x0, y1 - y0)
+
+
+def plan_ocr_regions(changed_regions, base_result, frame_shape, margin: int) -> list[Region]:
+    """
+    Pad changed regions and grow them over every previous text box they
+    touch, so no text line is cut in half by a region border.
+    """
+    height, width = frame_shape[:2]
+    base_regions = [box_to_region(box) for box, _, _ in base_result]
+    regions = []
+    for x, y, w, h in changed_regions:
+        x0, y0 = max(0, x - margin), max(0, y - margin)
+        x1, y1 = min(width, x + w + margin), min(height, y + h + margin)
+        region = (x0, y0, x1 - x0, y1 - y0)
+        for base_region in base_regions:
+            if regions_intersect(region, base_region):
+                region = union_region(region, base_region)
+        regions.append(region)
+    return regions
+
+
+class OCRPreprocessor:
+    """
+    Prepare images for the OCR reader: grayscale conversion, downscaling so
+    the smallest text of recent slides is about target_text_height pixels
+    high, and optional Otsu binarization. Boxes are mapped back to the
+    coordinates of the original image.
+    """
+    def __init__(
+        self,
+        grayscale: bool = True,
+        target_text_height: int | None = 32,
+        min_scale: float = 0.5,
+        text_height_percentile: float = 10,
+        binarize: bool = False,
+    ):
+        self.grayscale = grayscale
+        self.target_text_height = target_text_height
+        self.min_scale = min_scale
+        self.text_height_percentile = text_height_percentile
+        self.binarize = binarize
+        # Downscale factor, only ever below 1 once text heights are known
+        self.scale = 1.0
+
+    def observe(self, ocr_result):
+        """Update the downscale factor from the text boxes of an OCR result."""
+        if self.target_text_height is None or not ocr_result:
+            return
+        heights = [box_to_region(box)[3] for box, _, _ in ocr_result]
+        text_height = float(np.percentile(heights, self.text_height_percentile))
+        if text_height <= 0:
+            return
+        self.scale = min(1.0, max(self.min_scale, self.target_text_height / text_height))
+
+    def apply(self, image):
+        if (self.grayscale or self.binarize) and image.ndim == 3:
+            image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        if self.scale < 1.0:
+            image = cv2.resize(image, None, fx=self.scale, fy=self.scale, interpolation=cv2.INTER_AREA)
+        if self.binarize:
+            _, image = cv2.threshold(image, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        return image
+
+    def readtext(self, reader, image) -> list:
+        processed = self.apply(image)
+        scale_x = image.shape[1] / processed.shape[1]
+        scale_y = image.shape[0] / processed.shape[0]
+        return scale_ocr_result(reader.readtext(processed), scale_x, scale_y)
+
+    def recognize(self, reader, image, boxes: list[Region]) -> list:
+        processed = self.apply(image)
+        scale_x = image.shape[1] / processed.shape[1]
+        scale_y = image.shape[0] / processed.shape[0]
+        boxes = [
+            (int(x / scale_x), int(y / scale_y), max(1, int(w / scale_x)), max(1, int(h / scale_y)))
+            for x, y, w, h in boxes
+        ]
+        return scale_ocr_result(recognize_boxes(reader, processed, boxes), scale_x, scale_y)
+
+
+def scale_ocr_result(ocr_result, scale_x: float, scale_y: float) -> list:
+    if scale_x == 1.0 and scale_y == 1.0:
+        return ocr_result
+    return [
+        (
+            [[int(round(point[0] * scale_x)), int(round(point[1] * scale_y))] for point in box],
+            text,
+            confidence,
+        )
+        for box, text, confidence in ocr_result
+    ]
+
+
+def recognize_boxes(reader, image, boxes: list[Region]) -> list:
+    """Recognition only (no text detection) of the given boxes, shaped like `readtext` output."""
+    if image.ndim == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    horizontal_list = [[x, x + w, y, y + h] for x, y, w, h in boxes]
+    return reader.recognize(image, horizontal_list=horizontal_list, free_list=[])
+
+
+def layout_boxes(ocr_result, bounds: Region) -> list[Region]:
+    """
+    Text boxes of a result to reuse on slides of the same layout. Boxes are
+    widened to the whole width of the content area `bounds`, as lines of
+    other slides of the same layout may be longer, and boxes sharing rows
+    (e.g. words of one line, or columns) are merged into one line box.
+    """
+    left, _, width, _ = bounds
+    rows = sorted((y, y + h) for _, y, _, h in (box_to_region(box) for box, _, _ in ocr_result))
+    lines = []
+    for top, bottom in rows:
+        if lines and top < lines[-1][1]:
+            lines[-1][1] = max(lines[-1][1], bottom)
+        else:
+            lines.append([top, bottom])
+    return [(left, top, width, bottom - top) for top, bottom in lines]
+
+
+def readtext_image(reader, image, preprocessor: OCRPreprocessor | None = None) -> list:
+    if preprocessor is None:
+        return reader.readtext(image)
+    return preprocessor.readtext(reader, image)
+
+
+def readtext_regions(reader, frame, regions: list[Region], preprocessor: OCRPreprocessor | None = None) -> list:
+    """Run `readtext` on each region of the frame, with boxes in frame coordinates."""
+    ocr_result = []
+    for x, y, w, h in regions:
+        for box, text, confidence in readtext_image(reader, frame[y:y + h, x:x + w], preprocessor):
+            box = [[point[0] + x, point[1] + y] for point in box]
+            ocr_result.append((box, text, confidence))
+    return ocr_result
+
+
+def readtext_frame(
+    reader,
+    frame,
+    regions: list[Region] | None = None,
+    preprocessor: OCRPreprocessor | None = None,
+    boxes: list[Region] | None = None,
+) -> list:
+    """
+    Run `readtext` on the whole frame, or only on the given regions of it.
+    With known text boxes, skip text detection and only recognize them.
+    """
+    if boxes is not None:
+        if preprocessor is None:
+            return recognize_boxes(reader, frame, boxes)
+        return preprocessor.recognize(reader, frame, boxes)
+    if regions is None:
+        return readtext_image(reader, frame, preprocessor)
+    return readtext_regions(reader, frame, regions, preprocessor)
+
+
+def merge_region_results(base_result, regions: list[Region], region_result) -> list:
+    """Replace text of the previous result inside the regions with the fresh region result."""
+    kept = [
+        elem for elem in base_result
+        if not any(regions_intersect(box_to_region(elem[0]), region) for region in regions)
+    ]
+    merged = kept + list(region_result)
+    # Keep reading order: top to bottom, then left to right
+    merged.sort(key=lambda elem: (box_to_region(elem[0])[1], box_to_region(elem[0])[0]))
+    return merged
+
+
+@dataclass
+class OCRJob:
+    seq: int
+    frame: object
+    fingerprint: int | None = None
+    # When set, only these regions are OCR-ed and merged into base_result
+    regions: list[Region] | None = None
+    base_result: list | None = None
+    # Text layout fingerprint, and known text boxes to skip text detection
+    layout: int | None = None
+    boxes: list[Region] | None = None
+
+    @property
+    def bounds(self) -> Region:
+        """Area of the frame OCR-ed by a full (not incremental) job."""
+        if self.regions:
+            return self.regions[0]
+        return (0, 0, self.frame.shape[1], self.frame.shape[0])
+
+    def finalize(self, ocr_result) -> list:
+        if self.regions is None:
+            return ocr_result
+        return merge_region_results(self.base_result, self.regions, ocr_result)
+
+
+class OCRResultCache:
+    """
+    LRU cache of OCR results keyed by slide fingerprint.
+    A lookup hits if a cached fingerprint is within `max_distance` bits.
+    """
+    def __init__(
+        self,
+        max_size: int = 256,
+        max_age: float | None = None,
+        max_distance: int = 3,
+    ):
+        self.max_size = max_size
+        self.max_age = max_age
+        self.max_distance = max_distance
+        # fingerprint -> (stored_at, ocr_result), least recently used first
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _is_expired(self, stored_at: float, now: float) -> bool:
+        return self.max_age is not None and now - stored_at > self.max_age
+
+    def _evict_expired(self, now: float):
+        if self.max_age is None:
+            return
+        expired = [
+            fingerprint for fingerprint, (stored_at, _) in self._entries.items()
+            if self._is_expired(stored_at, now)
+        ]
+        for fingerprint in expired:
+            del self._entries[fingerprint]
+        self.evictions += len(expired)
+
+    def _find(self, fingerprint: int) -> int | None:
+        if fingerprint in self._entries:
+            return fingerprint
+        best, best_distance = None, self.max_distance + 1
+        for candidate in self._entries:
+            distance = hamming_distance(fingerprint, candidate)
+            if distance < best_distance:
+                best, best_distance = candidate, distance
+        return best
+
+    def get_item(self, fingerprint: int) -> tuple[int, object] | None:
+        """Return (cached fingerprint, OCR result) for a similar fingerprint, or None."""
+        now = time.time()
+        self._evict_expired(now)
+        key = self._find(fingerprint)
+        if key is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return key, self._entries[key][1]
+
+    def get(self, fingerprint: int):
+        """Return the cached OCR result for a similar fingerprint, or None."""
+        item = self.get_item(fingerprint)
+        return None if item is None else item[1]
+
+    def put(self, fingerprint: int, ocr_result):
+        self._entries[fingerprint] = (time.time(), ocr_result)
+        self._entries.move_to_end(fingerprint)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+class OCRResultStore:
+    """
+    Persistent SQLite store of OCR results keyed by slide fingerprint and
+    reader language list, so OCR work survives restarts.
+    The recency order of the rows is mirrored in memory, so lookups and
+    eviction need no table scan. Writes run in a background thread.
+    """
+    def __init__(self, path: str, max_entries: int = 10000):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self._conn = None
+        self._writer = None
+        self._writer_conn = None
+        # (fingerprint, lang_key) of the rows, least recently used first
+        self._keys = OrderedDict()
+
+    def __len__(self):
+        return len(self._keys)
+
+    def open(self):
+        if self._conn is not None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path)
+        # Reads from the caller thread do not wait for writes in progress
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS ocr_results ("
+            " fingerprint TEXT NOT NULL,"
+            " lang_key TEXT NOT NULL,"
+            " result TEXT NOT NULL,"
+            " last_used REAL NOT NULL,"
+            " PRIMARY KEY (fingerprint, lang_key))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ocr_results_last_used ON ocr_results (last_used)")
+        self._conn.commit()
+        rows = self._conn.execute("SELECT fingerprint, lang_key FROM ocr_results ORDER BY last_used").fetchall()
+        self._keys = OrderedDict(((int(fingerprint, 16), lang_key), None) for fingerprint, lang_key in rows)
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="OCRResultStore")
+        logger.info(f"Opened OCR result store at {self.path} with {len(self._keys)} results")
+
+    def close(self):
+        if self._conn is None:
+            return
+        # Flush pending writes
+        self._writer.submit(self._close_writer)
+        self._writer.shutdown(wait=True)
+        self._writer = None
+        self._conn.close()
+        self._conn = None
+
+    def _close_writer(self):
+        if self._writer_conn is not None:
+            self._writer_conn.close()
+            self._writer_conn = None
+
+    def _write(self, statements: list[tuple[str, tuple]]):
+        """Run statements in one transaction, in the writer thread."""
+        if self._writer_conn is None:
+            self._writer_conn = sqlite3.connect(self.path)
+        try:
+            with self._writer_conn:
+                for sql, params in statements:
+                    self._writer_conn.execute(sql, params)
+        except sqlite3.Error as e:
+            logger.error(f"Failed to write OCR result store: {e}")
+
+    @staticmethod
+    def make_lang_key(lang_list) -> str:
+        return ",".join(sorted(lang_list or []))
+
+    def load(self, lang_key: str, limit: int | None = None) -> list[tuple[int, list]]:
+        """Return (fingerprint, ocr_result) pairs, oldest first."""
+        self.open()
+        rows = self._conn.execute(
+            "SELECT fingerprint, result FROM ocr_results WHERE lang_key = ?"
+            " ORDER BY last_used DESC LIMIT ?",
+            (lang_key, -1 if limit is None else limit),
+        ).fetchall()
+        return [
+            (int(fingerprint, 16), ocr_result_from_jsonable(json.loads(result)))
+            for fingerprint, result in reversed(rows)
+        ]
+
+    def get_item(self, fingerprint: int, lang_key: str, max_distance: int = 0) -> tuple[int, list] | None:
+        """
+        Return (stored fingerprint, ocr_result) of the closest stored slide
+        within `max_distance` bits, or None. A hit counts as a use.
+        """
+        self.open()
+        key = (fingerprint, lang_key)
+        if key not in self._keys:
+            key, best_distance = None, max_distance + 1
+            for candidate, candidate_lang_key in self._keys:
+                if candidate_lang_key != lang_key:
+                    continue
+                distance = hamming_distance(fingerprint, candidate)
+                if distance < best_distance:
+                    key, best_distance = (candidate, candidate_lang_key), distance
+            if key is None:
+                return None
+        row = self._conn.execute(
+            "SELECT result FROM ocr_results WHERE fingerprint = ? AND lang_key = ?",
+            (format(key[0], "x"), lang_key),
+        ).fetchone()
+        if row is None:
+            # Not written yet
+            return None
+        self.touch(key[0], lang_key)
+        return key[0], ocr_result_from_jsonable(json.loads(row[0]))
+
+    def touch(self, fingerprint: int, lang_key: str):
+        """Mark a stored slide as just used, if stored."""
+        key = (fingerprint, lang_key)
+        if self._conn is None or key not in self._keys:
+            return
+        self._keys.move_to_end(key)
+        self._writer.submit(self._write, [(
+            "UPDATE ocr_results SET last_used = ? WHERE fingerprint = ? AND lang_key = ?",
+            (time.time(), format(fingerprint, "x"), lang_key),
+        )])
+
+    def put(self, fingerprint: int, lang_key: str, ocr_result):
+        self.open()
+        self._keys[(fingerprint, lang_key)] = None
+        self._keys.move_to_end((fingerprint, lang_key))
+        statements = [(
+            "INSERT OR REPLACE INTO ocr_results VALUES (?, ?, ?, ?)",
+            (format(fingerprint, "x"), lang_key, json.dumps(ocr_result_to_jsonable(ocr_result)), time.time()),
+        )]
+        while len(self._keys) > self.max_entries:
+            (evicted, evicted_lang_key), _ = self._keys.popitem(last=False)
+            statements.append((
+                "DELETE FROM ocr_results WHERE fingerprint = ? AND lang_key = ?",
+                (format(evicted, "x"), evicted_lang_key),
+            ))
+        self._writer.submit(self._write, statements)
+
+
+class SlideDeckIndex:
+    """
+    Fingerprint to OCR result index of a slide deck, built ahead of time
+    with `automixer ingest-deck` and matched against live frames.
+    """
+    VERSION = 1
+
+    def __init__(self, path: str, max_distance: int = 3, fingerprint_size: int | None = None):
+        self.path = Path(path)
+        self.max_distance = max_distance
+        # Fingerprint size of the live frames, the index must be built with the same
+        self.fingerprint_size = fingerprint_size
+        self.lang_key = None
+        # List of (fingerprint, source, ocr_result)
+        self.entries = []
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def add(self, fingerprint: int, source: str, ocr_result):
+        self.entries.append((fingerprint, source, ocr_result))
+
+    def match(self, fingerprint: int):
+        """Return the OCR result of the closest slide within `max_distance` bits, or None."""
+        best, best_distance = None, self.max_distance + 1
+        for candidate, _, ocr_result in self.entries:
+            distance = hamming_distance(fingerprint, candidate)
+            if distance < best_distance:
+                best, best_distance = ocr_result, distance
+        if best is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return best
+
+    def load(self):
+        with open(self.path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != self.VERSION:
+            raise ValueError(f"Unsupported slide deck index version: {data.get('version')}")
+        if self.fingerprint_size is not None and data["fingerprint_size"] != self.fingerprint_size:
+            raise ValueError(
+                f"Slide deck index {self.path} was built with fingerprint size {data['fingerprint_size']}, "
+                f"but slides are fingerprinted with size {self.fingerprint_size}, rebuild it with ingest-deck"
+            )
+        self.fingerprint_size = data["fingerprint_size"]
+        self.lang_key = data["lang_key"]
+        self.entries = [
+            (int(slide["fingerprint"], 16), slide["source"], ocr_result_from_jsonable(slide["ocr_result"]))
+            for slide in data["slides"]
+        ]
+        logger.info(f"Loaded slide deck index with {len(self.entries)} slides from {self.path}")
+
+    def save(self):
+        data = {
+            "version": self.VERSION,
+            "fingerprint_size": self.fingerprint_size,
+            "lang_key": self.lang_key,
+            "slides": [
+                {
+                    "fingerprint": format(fingerprint, "x"),
+                    "source": source,
+                    "ocr_result": ocr_result_to_jsonable(ocr_result),
+                }
+                for fingerprint, source, ocr_result in self.entries
+            ],
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+# Reader hosted by an OCR worker process, loaded once by the pool initializer
+_worker_reader = None
+
+
+def _init_ocr_worker(
+    reader_kwargs: dict,
+    torch_threads: int,
+    onnx_kwargs: dict | None = None,
+    worker_resources: ThreadResources | None = None,
+):
+    global _worker_reader
+    if worker_resources is not None:
+        # Before torch spawns its threads, which inherit the affinity
+        worker_resources.apply(f"OCR worker {multiprocessing.current_process().name}")
+    import torch
+    torch.set_num_threads(torch_threads)
+    if onnx_kwargs is not None:
+        from automixer.services.ocr_onnx import ONNXReader
+        _worker_reader = ONNXReader(**reader_kwargs, **onnx_kwargs)
+    else:
+        _worker_reader = Reader(**reader_kwargs)
+
+
+def _ocr_worker_ping() -> bool:
+    return _worker_reader is not None
+
+
+def _worker_readtext(frame, regions, preprocessor, boxes) -> list:
+    ocr_result = readtext_frame(_worker_reader, frame, regions, preprocessor, boxes)
+    # Plain Python types are cheaper to pickle back than numpy scalars
+    return ocr_result_from_jsonable(ocr_result_to_jsonable(ocr_result))
+
+
+def _ocr_worker_readtext(
+    shm_name: str, shape: tuple, dtype: str, regions=None, preprocessor=None, boxes=None
+) -> list:
+    """OCR a frame copied into its own short-lived shared memory segment."""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    # The parent owns (and unlinks) the segment, do not let this process track it
+    resource_tracker.unregister(shm._name, "shared_memory")
+    try:
+        frame = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        ocr_result = _worker_readtext(frame, regions, preprocessor, boxes)
+        del frame
+    finally:
+        shm.close()
+    return ocr_result
+
+
+def _ocr_worker_readtext_handle(descriptor: tuple, regions=None, preprocessor=None, boxes=None) -> list:
+    """OCR a frame read zero-copy from the frame store."""
+    return _worker_readtext(attach_frame(descriptor), regions, preprocessor, boxes)
+
+
+class OCRProcessPool:
+    """
+    Pool of worker processes each hosting its own easyocr Reader, so OCR
+    inference does not contend for the GIL with the main process.
+    Frames are handed over through shared memory.
+    """
+    def __init__(
+        self,
+        reader_kwargs: dict,
+        workers: int = 1,
+        torch_threads: int = 1,
+        onnx_kwargs: dict | None = None,
+    ):
+        self.reader_kwargs = reader_kwargs
+        self.workers = workers
+        self.torch_threads = torch_threads
+        # When set, workers run the ONNX Runtime backend (ONNXReader) with these options
+        self.onnx_kwargs = onnx_kwargs
+        # CPU affinity/priority of the workers, set by the resource governor
+        self.worker_resources = None
+        self._executor = None
+        self._futures = set()
+        self._lock = threading.Lock()
+
+    @property
+    def lang_list(self) -> list[str]:
+        return self.reader_kwargs.get("lang_list", [])
+
+    def start(self):
+        if self._executor is not None:
+            return
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_ocr_worker,
+            initargs=(self.reader_kwargs, self.torch_threads, self.onnx_kwargs, self.worker_resources),
+        )
+        # Spawn the workers and load the models now rather than on the first slide
+        for _ in range(self.workers):
+            self._executor.submit(_ocr_worker_ping)
+        logger.info(f"Started OCR process pool with {self.workers} worker(s)")
+
+    def shutdown(self):
+        if self._executor is None:
+            return
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = None
+        logger.info("Stopped OCR process pool")
+
+    @property
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._futures)
+
+    def has_capacity(self) -> bool:
+        return self.in_flight < self.workers
+
+    def _track(self, future: Future):
+        with self._lock:
+            self._futures.add(future)
+
+        def untrack(done: Future):
+            with self._lock:
+                self._futures.discard(done)
+
+        future.add_done_callback(untrack)
+
+    def submit(
+        self,
+        frame,
+        regions: list[Region] | None = None,
+        preprocessor: OCRPreprocessor | None = None,
+        boxes: list[Region] | None = None,
+    ) -> Future:
+        """
+        OCR a frame (numpy array or FrameHandle) in a worker. The caller must
+        keep a FrameHandle retained until the returned future is done.
+        """
+        if isinstance(frame, FrameHandle):
+            future = self._executor.submit(
+                _ocr_worker_readtext_handle, frame.descriptor(), regions, preprocessor, boxes
+            )
+            self._track(future)
+            return future
+
+        shm = shared_memory.SharedMemory(create=True, size=frame.nbytes)
+        shared_frame = np.ndarray(frame.shape, dtype=frame.dtype, buffer=shm.buf)
+        shared_frame[:] = frame
+        del shared_frame
+        future = self._executor.submit(
+            _ocr_worker_readtext, shm.name, frame.shape, frame.dtype.str, regions, preprocessor, boxes
+        )
+        self._track(future)
+
+        def release(done: Future):
+            shm.close()
+            shm.unlink()
+
+        future.add_done_callback(release)
+        return future
+
+
 class OCRService(ThreadService):
-    def __init__(self, bus, reader: Reader, expect_frame_timeout: float = 5.0):
+    def __init__(
+        self,
+        bus,
+        reader: Reader,
+        expect_frame_timeout: float = 5.0,
+        cache: OCRResultCache | None = None,
+        store: OCRResultStore | None = None,
+        deck_index: SlideDeckIndex | None = None,
+        process_pool: OCRProcessPool | None = None,
+        incremental_max_changed_fraction: float = 0.5,
+        incremental_region_margin: int = 16,
+        preprocessor: OCRPreprocessor | None = None,
+        layout_cache: OCRResultCache | None = None,
+        layout_min_confidence: float = 0.5,
+        lang_list: list[str] | None = None,
+    ):
         super().__init__(bus)
         self.reader = reader
+        self.preprocessor = preprocessor
+        # Text boxes keyed by text layout fingerprint, to skip text detection on template slides
+        self.layout_cache = layout_cache
+        self.layout_min_confidence = layout_min_confidence
+        self.layout_stats = StatCounters("OCR layout reuse")
+        self.process_pool = process_pool
         self.expect_frame_timeout = expect_frame_timeout
-        self._pending_frame_queue = Queue()
+        if store is not None and cache is None:
+            # Persisted results are looked up through the in-memory cache
+            cache = OCRResultCache()
+        self.cache = cache
+        self.store = store
+        self.deck_index = deck_index
+        self.incremental_max_changed_fraction = incremental_max_changed_fraction
+        self.incremental_region_margin = incremental_region_margin
+        # (fingerprint, ocr_result, frame shape) of the last result OCR-ed from a live frame,
+        # None after a known result whose boxes may not be in live frame coordinates
+        self._last_result = None
+        # Languages the reader was configured with, the same in thread and process pool mode
+        if lang_list is None and process_pool is not None:
+            lang_list = process_pool.lang_list
+        self._lang_key = OCRResultStore.make_lang_key(lang_list)
+        # Latest-wins pending work: a newer frame replaces one not yet started
+        self._pending_condition = threading.Condition()
+        self._pending_item = None
+        self._submitted_seq = 0
         self._ocr_result_queue = Queue()
-
+        self.queue_stats = StatCounters("OCR queue")
 
     async def up(self):
         await super().up()
-        self.start()
+        if self.deck_index is not None:
+            self.load_deck_index()
+        if self.store is not None:
+            self.warm_load()
+        if self.process_pool is not None:
+            self.process_pool.start()
+        else:
+            self.start()
+
+    async def down(self):
+        await super().down()
+        if self.process_pool is not None:
+            self.process_pool.shutdown()
+        if self.store is not None:
+            self.store.close()
+
+    def load_deck_index(self):
+        self.deck_index.load()
+        if self.deck_index.lang_key != self._lang_key:
+            logger.warning(
+                f"Slide deck index was built for languages '{self.deck_index.lang_key}', "
+                f"but reader uses '{self._lang_key}'"
+            )
+
+    def warm_load(self):
+        """Fill the in-memory cache with the most recently used persisted results."""
+        entries = self.store.load(self._lang_key, limit=self.cache.max_size)
+        for fingerprint, ocr_result in entries:
+            self.cache.put(fingerprint, ocr_result)
+        logger.info(f"Warm-loaded {len(entries)} OCR results from store")
+
+    def lookup(self, fingerprint: int):
+        """OCR result of a known similar slide from the cache, or else from the store, or None."""
+        item = self.cache.get_item(fingerprint)
+        logger.debug(f"OCR cache stats: {self.cache.stats()}")
+        if item is not None:
+            if self.store is not None:
+                self.store.touch(item[0], self._lang_key)
+            return item[1]
+        if self.store is None:
+            return None
+        item = self.store.get_item(fingerprint, self._lang_key, self.cache.max_distance)
+        if item is None:
+            return None
+        logger.debug("Found OCR result in store")
+        self.cache.put(*item)
+        return item[1]
+
+    @property
+    def queue_depth(self) -> int:
+        return int(self._pending_item is not None) + self._ocr_result_queue.qsize()
+
+    def _take_pending(self, timeout: float | None = 0.1):
+        with self._pending_condition:
+            if self._pending_item is None and timeout:
+                self._pending_condition.wait(timeout=timeout)
+            item, self._pending_item = self._pending_item, None
+        return item
+
+    def _replace_pending(self, job):
+        with self._pending_condition:
+            superseded, self._pending_item = self._pending_item, job
+            self._pending_condition.notify()
+        if superseded is not None:
+            self.queue_stats.inc("dropped_superseded")
+            release_frame(superseded.frame)
 
     def run(self):
         while not self.should_stop():
             if self.should_pause():
                 continue
-            if self._pending_frame_queue.empty():
-                continue
-            frame = self._pending_frame_queue.get()
-            if frame is None:
+            job = self._take_pending()
+            if job is None:
                 continue
-            ocr_result = self.reader.readtext(frame)
-            self._ocr_result_queue.put((frame, ocr_result))
+            frame = as_array(job.frame)
+            ocr_result = readtext_frame(self.reader, frame, job.regions, self.preprocessor, job.boxes)
+            del frame
+            self._ocr_result_queue.put((job, ocr_result))
+
+    def _submit_to_process_pool(self):
+        while self.process_pool.has_capacity():
+            job = self._take_pending(timeout=None)
+            if job is None:
+                return
+            future = self.process_pool.submit(job.frame, job.regions, self.preprocessor, job.boxes)
+
+            def on_done(done: Future, job=job):
+                if done.cancelled():
+                    release_frame(job.frame)
+                    return
+                if done.exception() is not None:
+                    logger.error(f"OCR worker failed: {done.exception()}")
+                    release_frame(job.frame)
+                    return
+                self._ocr_result_queue.put((job, done.result()))
+
+            future.add_done_callback(on_done)
 
     def stop(self):
         super().stop()
         # Empty all queue
-        while not self._pending_frame_queue.empty():
-            self._pending_frame_queue.get()
+        self._replace_pending(None)
         while not self._ocr_result_queue.empty():
-            self._ocr_result_queue.get()
+            job, _ = self._ocr_result_queue.get()
+            release_frame(job.frame)
+
+    def plan_incremental(self, frame, changed_regions, previous_fingerprint, roi=None) -> list[Region] | None:
+        """
+        Regions to re-OCR on top of the last result, or None when the whole
+        slide content area has to be OCR-ed.
+        """
+        if (changed_regions is None
+                or self._last_result is None
+                or previous_fingerprint is None
+                or self._last_result[0] != previous_fingerprint
+                or self._last_result[2] != tuple(frame.shape)):
+            return None
+        regions = plan_ocr_regions(
+            changed_regions, self._last_result[1], frame.shape, self.incremental_region_margin
+        )
+        changed_area = sum(w * h for _, _, w, h in regions)
+        _, _, width, height = roi or (0, 0, frame.shape[1], frame.shape[0])
+        if changed_area > self.incremental_max_changed_fraction * width * height:
+            return None
+        return regions
+
+    def submit(
+        self,
+        frame,
+        fingerprint: int | None = None,
+        changed_regions: list[Region] | None = None,
+        previous_fingerprint: int | None = None,
+        roi: Region | None = None,
+    ):
+        """
+        Dispatch a known OCR result for the frame if available, else queue it for OCR.
+        Either way, the frame supersedes all frames submitted before.
+        Only the slide content area `roi` of the frame is OCR-ed, if given.
+        """
+        self._submitted_seq += 1
+        self.queue_stats.inc("submitted")
+        if self.deck_index is not None and fingerprint is not None:
+            ocr_result = self.deck_index.match(fingerprint)
+            if ocr_result is not None:
+                logger.debug("Matched frame against slide deck index")
+                self._replace_pending(None)
+                self._dispatch_result(frame, fingerprint, ocr_result, live=False)
+                return
+        if self.cache is not None and fingerprint is not None:
+            ocr_result = self.lookup(fingerprint)
+            if ocr_result is not None:
+                self._replace_pending(None)
+                self._dispatch_result(frame, fingerprint, ocr_result, live=False)
+                return
+        # The job keeps the frame alive until its result is handled
+        job = OCRJob(self._submitted_seq, retain_frame(frame), fingerprint)
+        regions = self.plan_incremental(frame, changed_regions, previous_fingerprint, roi)
+        if regions is not None:
+            logger.debug(f"Incremental OCR on {len(regions)} changed region(s)")
+            job.regions = regions
+            job.base_result = self._last_result[1]
+        else:
+            if roi is not None:
+                job.regions = [roi]
+                job.base_result = []
+            self.plan_layout(job, frame, roi)
+        self._replace_pending(job)
+
+    def plan_layout(self, job: OCRJob, frame, roi: Region | None = None):
+        """Reuse the text boxes of a previous slide with the same text layout, if any."""
+        if self.layout_cache is None:
+            return
+        frame = as_array(frame)
+        if roi is not None:
+            x, y, w, h = roi
+            frame = frame[y:y + h, x:x + w]
+        job.layout = layout_fingerprint(frame)
+        item = self.layout_cache.get_item(job.layout)
+        if item is None:
+            return
+        cached_layout, boxes = item
+        if job.layout & ~cached_layout:
+            # Text in a band the cached boxes do not cover (e.g. an added footer line)
+            self.layout_stats.inc("uncovered")
+            return
+        job.boxes = boxes
+        self.layout_stats.inc("reused")
+
+    def layout_recognition_failed(self, job: OCRJob, ocr_result) -> bool:
+        if job.boxes is None:
+            return False
+        if not ocr_result:
+            return True
+        mean_confidence = sum(confidence for _, _, confidence in ocr_result) / len(ocr_result)
+        return mean_confidence < self.layout_min_confidence
+
+    def _dispatch_result(self, frame, fingerprint, ocr_result, live: bool = True):
+        """Dispatch the OCR result of a frame, `live` if OCR-ed from the frame itself."""
+        logger.debug(f"OCR result for slide: {ocr_result}")
+        # Deck index boxes are in deck image coordinates, cached ones maybe of another resolution
+        self._last_result = (fingerprint, ocr_result, tuple(frame.shape)) if live else None
+        event = SlideOCREvent(
+            slide=frame,
+            ocr_result=ocr_result,
+            fingerprint=fingerprint,
+        )
+        self.bus.dispatch(event)
+        release_after(event, frame)
 
     @autoregister
     async def on_program_change(self, event: ProgramChangeEvent):
@@ -59,17 +975,68 @@ class OCRService(ThreadService):
         except asyncio.TimeoutError:
             logger.warning("No valid camera frame received within timeout after program change.")
             return
-        self._pending_frame_queue.put(cam_frame_event.frame)
+        try:
+            self.submit(cam_frame_event.frame, cam_frame_event.fingerprint, roi=cam_frame_event.roi)
+        except StaleFrameError:
+            logger.warning("Camera frame received after program change is no longer available.")
 
     @autoregister
-    async def on_slide_change(self, event: SlideChangeEvent):
-        self._pending_frame_queue.put(event.slide)
+    async def on_slide_settled(self, event: SlideSettledEvent):
+        # Only settled slides are OCR-ed, not frames in the middle of a transition
+        self.submit(
+            event.slide,
+            event.fingerprint,
+            changed_regions=event.changed_regions,
+            previous_fingerprint=event.previous_fingerprint,
+            roi=event.roi,
+        )
 
     async def step(self):
+        self.queue_stats.maybe_log(logger)
+        self.layout_stats.maybe_log(logger)
+        if self.process_pool is not None and not self.should_pause():
+            self._submit_to_process_pool()
         while not self._ocr_result_queue.empty():
-            frame, ocr_result = self._ocr_result_queue.get()
-            logger.debug(f"OCR result for slide: {ocr_result}")
-            self.bus.dispatch(SlideOCREvent(slide=frame, ocr_result=ocr_result))
+            job, ocr_result = self._ocr_result_queue.get()
+            if self.layout_recognition_failed(job, ocr_result):
+                self.layout_stats.inc("fallback")
+                if job.seq == self._submitted_seq:
+                    # Same layout but different boxes, detect text from scratch
+                    job.boxes = None
+                    self._replace_pending(job)
+                else:
+                    release_frame(job.frame)
+                continue
+            ocr_result = job.finalize(ocr_result)
+            fingerprint = job.fingerprint
+            if job.layout is not None and job.boxes is None and ocr_result:
+                self.layout_cache.put(job.layout, layout_boxes(ocr_result, job.bounds))
+            if self.preprocessor is not None:
+                self.preprocessor.observe(ocr_result)
+            # Stale results are still worth caching for when the slide comes back
+            if self.cache is not None and fingerprint is not None:
+                self.cache.put(fingerprint, ocr_result)
+            if self.store is not None and fingerprint is not None:
+                self.store.put(fingerprint, self._lang_key, ocr_result)
+            if job.seq != self._submitted_seq:
+                self.queue_stats.inc("discarded_stale")
+                logger.debug("Discarded OCR result of a superseded frame")
+            else:
+                self._dispatch_result(job.frame, fingerprint, ocr_result)
+            release_frame(job.frame)
 
 
-__all__ = ["OCRService"]
+__all__ = [
+    "OCRResultCache",
+    "OCRResultStore",
+    "SlideDeckIndex",
+    "OCRJob",
+    "OCRProcessPool",
+    "OCRPreprocessor",
+    "readtext_frame",
+    "recognize_boxes",
+    "layout_boxes",
+    "ocr_result_to_jsonable",
+    "ocr_result_from_jsonable",
+    "OCRService",
+]
@@ -0,0 +1,128 @@
+from logging import getLogger
+from pathlib import Path
+import easyocr
+from easyocr import Reader
+import torch
+
+
+logger = getLogger(__name__)
+
+
+class ONNXModule:
+    """Callable standing in for a torch model inside easyocr, running an onnxruntime session."""
+
+    def __init__(self, session):
+        self.session = session
+        # Inputs unused by the model (e.g. text of the recognizer) are pruned at export
+        self.input_names = [model_input.name for model_input in session.get_inputs()]
+
+    def eval(self):
+        return self
+
+    def __call__(self, *inputs):
+        feed = {
+            name: tensor.cpu().numpy()
+            for name, tensor in zip(self.input_names, inputs)
+        }
+        outputs = [torch.from_numpy(output) for output in self.session.run(None, feed)]
+        return outputs[0] if len(outputs) == 1 else tuple(outputs)
+
+
+class ONNXReader(Reader):
+    """
+    easyocr Reader running its CRAFT detector and recognizer with onnxruntime
+    on CPU. The torch models are exported to ONNX (optionally int8-quantized)
+    on first use and cached in `model_dir`. Everything else, including the
+    output of `readtext` and `recognize`, is easyocr's own.
+    """
+    def __init__(
+        self,
+        lang_list: list[str],
+        model_dir: str = "~/.automixer/onnx",
+        quantize_int8: bool = False,
+        threads: int | None = None,
+        **reader_kwargs,
+    ):
+        try:
+            import onnxruntime
+        except ImportError as e:
+            raise ImportError("ONNX OCR backend requires onnxruntime, install automixer[onnx]") from e
+        if reader_kwargs.get("detect_network", "craft") != "craft":
+            raise ValueError("ONNX OCR backend only supports the craft detector")
+        # Export needs plain float torch models on CPU
+        reader_kwargs.update(gpu=False, quantize=False)
+        super().__init__(lang_list, **reader_kwargs)
+
+        self.model_dir = Path(model_dir).expanduser()
+        self.quantize_int8 = quantize_int8
+        # Exports are only reused for the same easyocr models
+        suffix = f"_easyocr{easyocr.__version__}" + ("_int8" if quantize_int8 else "")
+        recog_network = reader_kwargs.get("recog_network", "standard")
+        detector_path = self.model_dir / f"craft{suffix}.onnx"
+        recognizer_path = self.model_dir / f"recognizer_{recog_network}_{'_'.join(sorted(lang_list))}{suffix}.onnx"
+        if not detector_path.exists():
+            self.export_detector(detector_path)
+        if not recognizer_path.exists():
+            self.export_recognizer(recognizer_path)
+
+        options = onnxruntime.SessionOptions()
+        if threads is not None:
+            options.intra_op_num_threads = threads
+        providers = ["CPUExecutionProvider"]
+        # The torch models are dropped, inference only goes through the sessions
+        self.detector = ONNXModule(onnxruntime.InferenceSession(str(detector_path), options, providers=providers))
+        self.recognizer = ONNXModule(onnxruntime.InferenceSession(str(recognizer_path), options, providers=providers))
+        logger.info(f"Loaded ONNX OCR models from {self.model_dir}")
+
+    def _export(self, model, args, path: Path, input_names, output_names, dynamic_axes):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        export_path = path.with_name(f"{path.stem}_fp32.onnx") if self.quantize_int8 else path
+        logger.info(f"Exporting OCR model to {export_path}")
+        with torch.no_grad():
+            torch.onnx.export(
+                model,
+                args,
+                str(export_path),
+                input_names=input_names,
+                output_names=output_names,
+                dynamic_axes=dynamic_axes,
+                opset_version=17,
+            )
+        if self.quantize_int8:
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+            quantize_dynamic(str(export_path), str(path), weight_type=QuantType.QInt8)
+            export_path.unlink()
+
+    def export_detector(self, path: Path):
+        image = torch.randn(1, 3, 640, 640)
+        self._export(
+            self.detector.eval(),
+            (image,),
+            path,
+            input_names=["image"],
+            output_names=["score", "feature"],
+            dynamic_axes={
+                "image": {0: "batch", 2: "height", 3: "width"},
+                "score": {0: "batch", 1: "score_height", 2: "score_width"},
+                "feature": {0: "batch", 2: "feature_height", 3: "feature_width"},
+            },
+        )
+
+    def export_recognizer(self, path: Path):
+        # easyocr recognizers take 64 pixel high text lines
+        image = torch.randn(1, 1, getattr(self, "imgH", 64), 256)
+        text = torch.zeros(1, 1, dtype=torch.long)
+        self._export(
+            self.recognizer.eval(),
+            (image, text),
+            path,
+            input_names=["image", "text"],
+            output_names=["prediction"],
+            dynamic_axes={
+                "image": {0: "batch", 3: "width"},
+                "prediction": {0: "batch", 1: "length"},
+            },
+        )
+
+
+__all__ = ["ONNXModule", "ONNXReader"]
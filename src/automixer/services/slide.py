@@ -1,18 +1,61 @@
 import asyncio
+from collections import deque
 from logging import getLogger
 import importlib.resources
+import time
 import numpy as np
 import cv2
 from automixer.core.events import (
-    SlideChangeEvent, CameraFrameEvent, ValidCameraFrameEvent
+    SlideChangeEvent,
+    SlideSettledEvent,
+    CameraFrameEvent,
+    ValidCameraFrameEvent,
+    MotionContentEvent,
 )
+from automixer.core.frames import as_array, release_after, release_frame, retain_frame
 from automixer.services.base import BaseService, autoregister
-from automixer.utils.vision import sobel_edge
+from automixer.utils.stats import StatCounters
+from automixer.utils.vision import (
+    FrameWorkspace,
+    changed_regions,
+    detect_content_region,
+    dhash,
+    downscale_gray,
+    gray_pyramid,
+    union_regions,
+)
 
 
 logger = getLogger(__name__)
 
 
+class MotionDetector:
+    """
+    Classify the recent frame diff history as sustained motion: at least
+    enter_frames changed frames out of the last window frames. Motion ends
+    after exit_frames consecutive unchanged frames.
+    """
+    def __init__(self, window: int = 10, enter_frames: int = 6, exit_frames: int = 5):
+        self.enter_frames = enter_frames
+        self.exit_frames = exit_frames
+        self.in_motion = False
+        self._history = deque(maxlen=window)
+        self._unchanged_frames = 0
+
+    def update(self, changed: bool) -> bool:
+        """Record a frame diff, return True if the motion state flipped."""
+        self._history.append(changed)
+        self._unchanged_frames = 0 if changed else self._unchanged_frames + 1
+        if not self.in_motion and sum(self._history) >= self.enter_frames:
+            self.in_motion = True
+            return True
+        if self.in_motion and self._unchanged_frames >= self.exit_frames:
+            self.in_motion = False
+            self._history.clear()
+            return True
+        return False
+
+
 class SlideService(BaseService):
     def __init__(
         self,
@@ -21,82 +64,359 @@ class SlideService(BaseService):
         edge_threshold=20,
         full_black_threshold_mean=36,
         full_black_threshold_std=5,
+        pyramid_scales=(0.25,),
+        escalation_band_low=0.5,
+        escalation_band_high=2.0,
+        fingerprint_size=16,
+        validity_sample_stride=4,
+        placeholder_signature_width=160,
+        placeholder_signature_threshold=0.6,
+        settle_frames=1,
+        settle_time=0.3,
+        change_tile_size=32,
+        change_tile_threshold=10,
+        motion_window=10,
+        motion_enter_frames=6,
+        motion_exit_frames=5,
+        roi=None,
+        auto_roi=True,
+        roi_black_threshold=24,
     ):
         super().__init__(bus)
         self.prev_frame = None
+        self.prev_pyramid = None
+        self.workspace = FrameWorkspace()
         self.diff_threshold = diff_threshold
         self.edge_threshold = edge_threshold
         self.full_black_threshold_mean = full_black_threshold_mean
         self.full_black_threshold_std = full_black_threshold_std
+        self.pyramid_scales = list(pyramid_scales)
+        # Coarse stage decides alone outside of this band (relative to diff_threshold)
+        self.escalation_band_low = escalation_band_low
+        self.escalation_band_high = escalation_band_high
+        self.fingerprint_size = fingerprint_size
         self.obs_vcam_default_template = cv2.imread(str(
             importlib.resources.files("automixer").joinpath("resources", "image", "obs_vcam_default.png")
         ))
         if self.obs_vcam_default_template is None:
             logger.warning("Failed to load OBS VCam default template image.")
+        self.validity_sample_stride = max(1, validity_sample_stride)
+        self.placeholder_signature_width = placeholder_signature_width
+        self.placeholder_signature_threshold = placeholder_signature_threshold
+        # Capture resolution -> (scale, grayscale template rescaled by scale)
+        self._placeholder_signatures = {}
+        self.validity_stats = StatCounters("Slide frame validity")
+        self.settle_frames = settle_frames
+        self.settle_time = settle_time
+        # Settling state of the latest slide change, None when settled
+        self._settling_since = None
+        self._stable_frames = 0
+        self._settled_frame = None
+        self._settled_fingerprint = None
+        self.change_tile_size = change_tile_size
+        self.change_tile_threshold = change_tile_threshold
+        # Slide changes and settling are throttled while the slide shows motion
+        self.motion_detector = None
+        if motion_window > 0:
+            self.motion_detector = MotionDetector(motion_window, motion_enter_frames, motion_exit_frames)
+        self.motion_stats = StatCounters("Slide motion")
+        # Last frame before the motion started, the picture after it is compared to
+        self._motion_reference = None
+        # Slide content area (x, y, w, h) all processing is cropped to, None for the whole frame
+        self.static_roi = tuple(roi) if roi is not None else None
+        self.auto_roi = auto_roi
+        self.roi_black_threshold = roi_black_threshold
+        self.roi = self.static_roi
+        # Capture resolution the ROI was detected for
+        self._roi_frame_shape = None
+        self._roi_stale = False
+
+    def _get_placeholder_signature(self, frame_shape):
+        signature = self._placeholder_signatures.get(frame_shape)
+        if signature is None:
+            scale = min(1.0, self.placeholder_signature_width / frame_shape[1])
+            template = downscale_gray(self.obs_vcam_default_template, scale)
+            signature = (scale, template)
+            self._placeholder_signatures[frame_shape] = signature
+        return signature
+
+    def may_be_obs_vcam_default(self, frame):
+        """
+        Cheap check matching a low-resolution template against a low-resolution
+        frame. False means the frame is surely not the placeholder.
+        """
+        scale, template = self._get_placeholder_signature(frame.shape)
+        frame_small = downscale_gray(frame, scale)
+        if (template.shape[0] > frame_small.shape[0]
+                or template.shape[1] > frame_small.shape[1]):
+            return False
+        result = cv2.matchTemplate(frame_small, template, cv2.TM_CCOEFF_NORMED)
+        return np.max(result) > self.placeholder_signature_threshold
 
     def is_obs_vcam_default(self, frame):
         if self.obs_vcam_default_template is None:
             return False
-        # Simple template matching approach
-        result = cv2.matchTemplate(frame, self.obs_vcam_default_template, cv2.TM_CCOEFF_NORMED)
+        template = self.obs_vcam_default_template
+        if (template.shape[0] > frame.shape[0]
+                or template.shape[1] > frame.shape[1]):
+            return False
+        if not self.may_be_obs_vcam_default(frame):
+            self.validity_stats.inc("placeholder_signature_cleared")
+            return False
+        # Template matching at full resolution as last resort
+        self.validity_stats.inc("placeholder_template_matched")
+        result = cv2.matchTemplate(frame, template, cv2.TM_CCOEFF_NORMED)
         return np.max(result) > 0.9  # Threshold for match confidence
 
     def is_full_black(self, frame):
-        mean = np.mean(frame)
-        std = np.std(frame)
-        return (mean < self.full_black_threshold_mean
-                and std < self.full_black_threshold_std)
+        # Statistics over a subsampled grid are close enough for a black check
+        stride = self.validity_sample_stride
+        sample = frame[::stride, ::stride]
+        mean, std = cv2.meanStdDev(sample.reshape(-1, 1))
+        return (mean[0, 0] < self.full_black_threshold_mean
+                and std[0, 0] < self.full_black_threshold_std)
 
     def frame_is_valid(self, frame):
-        return (
-            frame is not None
-            and not self.is_full_black(frame)
-            and not self.is_obs_vcam_default(frame)
-        )
+        self.validity_stats.maybe_log(logger)
+        if frame is None:
+            self.validity_stats.inc("rejected_missing")
+            return False
+        if self.is_full_black(frame):
+            self.validity_stats.inc("rejected_black")
+            return False
+        if self.is_obs_vcam_default(frame):
+            self.validity_stats.inc("rejected_placeholder")
+            return False
+        self.validity_stats.inc("accepted")
+        return True
+
+    def update_roi(self, frame):
+        """
+        Detect the slide content area on resolution change and after a slide
+        settles. The ROI only grows until the resolution changes, so a dark
+        slide cannot hide content of the next one.
+        """
+        if self.static_roi is not None or not self.auto_roi:
+            return self.roi
+        if self._roi_frame_shape == frame.shape and not self._roi_stale:
+            return self.roi
+        self._roi_stale = False
+        detected = detect_content_region(frame, self.roi_black_threshold)
+        full_frame = (0, 0, frame.shape[1], frame.shape[0])
+        if self._roi_frame_shape == frame.shape:
+            # Same resolution, content may have spread over the bars
+            detected = union_regions(self.roi or full_frame, detected or full_frame)
+        if detected == full_frame:
+            detected = None
+        if detected != self.roi:
+            logger.info(f"Slide content area changed to {detected or 'whole frame'}")
+            # Pyramids of the previous frame were cropped differently
+            self.prev_pyramid = None
+        self.roi = detected
+        self._roi_frame_shape = frame.shape
+        return self.roi
+
+    def crop_to_roi(self, frame):
+        if self.roi is None:
+            return frame
+        x, y, w, h = self.roi
+        return frame[y:y + h, x:x + w]
+
+    def calculate_pyramid(self, frame):
+        return gray_pyramid(frame, self.pyramid_scales)
+
+    def calculate_fingerprint(self, frame, pyramid=None):
+        # Coarsest pyramid level is plenty for a thumbnail hash
+        gray = pyramid[0] if pyramid else downscale_gray(frame, 1.0)
+        return dhash(gray, self.fingerprint_size)
 
-    def calculate_edge(self, frame):
-        # Edge detection using grayscale conversion and Sobel operator
-        frame_gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        edge_gray = sobel_edge(frame_gray)
-        edge = cv2.cvtColor(edge_gray, cv2.COLOR_GRAY2BGR)
-        return edge
+    def coarse_frames_are_different(self, pyramid1, pyramid2):
+        """
+        Compare downscaled grayscale levels, coarsest first.
+        Return True/False when a level is conclusive, or None to escalate.
+        """
+        low = self.diff_threshold * self.escalation_band_low
+        high = self.diff_threshold * self.escalation_band_high
+        for level1, level2 in zip(pyramid1, pyramid2):
+            mean_diff = self.workspace.mean_abs_diff(level1, level2)
+            if mean_diff < low:
+                return False
+            if mean_diff > high:
+                return True
+        return None
 
-    def calculate_abs_diff(self, frame1, frame2):
-        return np.abs(
-            frame1.astype(np.int16)
-            - frame2.astype(np.int16)
-        ).astype(np.uint8)
+    def frames_are_different(self, frame1, frame2, pyramid1=None, pyramid2=None):
+        if frame1.shape != frame2.shape:
+            return True
+        if self.pyramid_scales:
+            if pyramid1 is None:
+                pyramid1 = self.calculate_pyramid(frame1)
+            if pyramid2 is None:
+                pyramid2 = self.calculate_pyramid(frame2)
+            coarse_result = self.coarse_frames_are_different(pyramid1, pyramid2)
+            if coarse_result is not None:
+                return coarse_result
+            logger.debug("Coarse slide diff ambiguous, escalating to full resolution")
+        return self.full_frames_are_different(frame1, frame2)
 
-    def frames_are_different(self, frame1, frame2):
+    def full_frames_are_different(self, frame1, frame2):
         # Calculate average of absolute difference
-        # considering only non-edge areas
-        edge = self.calculate_edge(frame1)
-        diff = self.calculate_abs_diff(frame1, frame2)
-        diff *= edge < self.edge_threshold  # Ignore noises in edges
-        mean_diff = np.mean(diff)
+        # considering only non-edge areas (ignore noises in edges)
+        non_edge = self.workspace.non_edge_mask(frame1, self.edge_threshold)
+        mean_diff = self.workspace.mean_abs_diff(frame1, frame2, mask=non_edge)
         # Threshold check
         return mean_diff > self.diff_threshold
 
+    def calculate_changed_regions(self, frame1, frame2):
+        """Changed regions between two ROI-cropped frames, in frame coordinates."""
+        if frame1.shape != frame2.shape:
+            return None
+        regions = changed_regions(
+            downscale_gray(frame1, 1.0),
+            downscale_gray(frame2, 1.0),
+            self.change_tile_size,
+            self.change_tile_threshold,
+        )
+        if self.roi is None:
+            return regions
+        roi_x, roi_y = self.roi[:2]
+        return [(x + roi_x, y + roi_y, w, h) for x, y, w, h in regions]
+
+    def _replace_reference(self, name: str, frame):
+        """Keep a reference on a frame held beyond the handler, dropping the previous one."""
+        previous = getattr(self, name)
+        setattr(self, name, retain_frame(frame))
+        release_frame(previous)
+
+    def update_motion(self, changed: bool) -> bool:
+        """Update the motion classifier, return True while the slide shows motion."""
+        self.motion_stats.maybe_log(logger)
+        if self.motion_detector is None:
+            return False
+        if self.motion_detector.update(changed):
+            in_motion = self.motion_detector.in_motion
+            logger.info(f"Slide motion content {'started' if in_motion else 'stopped'}")
+            if in_motion:
+                self.motion_stats.inc("motion_started")
+                # Changes are reported again once the motion stops, against the picture before it
+                self._replace_reference("_motion_reference", self.prev_frame)
+            self.bus.dispatch(MotionContentEvent(in_motion=in_motion))
+        return self.motion_detector.in_motion
+
+    def report_change_after_motion(self, frame_ref, frame, fingerprint, roi):
+        """
+        Emit a single SlideChangeEvent if the picture the motion stopped on
+        differs from the one before it, e.g. the slide changed during a video.
+        """
+        reference_ref, self._motion_reference = self._motion_reference, None
+        if reference_ref is None:
+            return
+        reference = self.crop_to_roi(as_array(reference_ref))
+        if self.frames_are_different(frame, reference):
+            self.motion_stats.inc("changed_during_motion")
+            new_event = SlideChangeEvent(
+                slide=frame_ref,
+                previous_slide=reference_ref,
+                fingerprint=fingerprint,
+                changed_regions=self.calculate_changed_regions(frame, reference),
+                roi=roi,
+            )
+            self.bus.dispatch(new_event)
+            release_after(new_event, frame_ref, reference_ref)
+        release_frame(reference_ref)
+
+    def update_settling(self, frame_ref, frame, fingerprint, changed: bool):
+        """
+        Track the diff signal after a slide change and emit a single
+        SlideSettledEvent once the picture is unchanged for settle_frames
+        frames and settle_time seconds.
+        """
+        now = time.monotonic()
+        if changed:
+            # Stability is timed from the last change, not the first of a transition
+            self._settling_since = now
+            self._stable_frames = 0
+            return
+        if self._settling_since is None:
+            return
+        self._stable_frames += 1
+        if (self._stable_frames >= self.settle_frames
+                and now - self._settling_since >= self.settle_time):
+            logger.debug(f"Slide settled after {now - self._settling_since:.2f}s")
+            self._settling_since = None
+            self._stable_frames = 0
+            regions = None
+            if self._settled_frame is not None:
+                settled_frame = self.crop_to_roi(as_array(self._settled_frame))
+                regions = self.calculate_changed_regions(frame, settled_frame)
+            settled_event = SlideSettledEvent(
+                slide=frame_ref,
+                fingerprint=fingerprint,
+                changed_regions=regions,
+                previous_fingerprint=self._settled_fingerprint,
+                roi=self.roi,
+            )
+            self.bus.dispatch(settled_event)
+            release_after(settled_event, frame_ref)
+            self._replace_reference("_settled_frame", frame_ref)
+            self._settled_fingerprint = fingerprint
+            # A new slide may come with a new layout
+            self._roi_stale = True
+
     @autoregister
     async def on_camera_frame(self, event: CameraFrameEvent):
-        frame = event.frame
+        # Frame may be a FrameHandle, pass the reference along and read its pixels
+        frame_ref = event.frame
+        frame = as_array(frame_ref) if frame_ref is not None else None
 
         if not self.frame_is_valid(frame):
             return
-        self.bus.dispatch(ValidCameraFrameEvent(frame=frame))
+
+        roi = self.update_roi(frame)
+        # Diff, fingerprint and changed regions only look at the slide content area
+        frame = self.crop_to_roi(frame)
+        pyramid = self.calculate_pyramid(frame)
+        fingerprint = self.calculate_fingerprint(frame, pyramid)
+        valid_event = ValidCameraFrameEvent(
+            frame=frame_ref,
+            captured_at=event.captured_at,
+            fingerprint=fingerprint,
+            roi=roi,
+        )
+        self.bus.dispatch(valid_event)
+        release_after(valid_event, frame_ref)
 
         if self.prev_frame is None:
-            self.prev_frame = frame
+            self._replace_reference("prev_frame", frame_ref)
+            self.prev_pyramid = pyramid
+            self._replace_reference("_settled_frame", frame_ref)
+            self._settled_fingerprint = fingerprint
             return
 
-        if self.frames_are_different(frame, self.prev_frame):
+        prev_frame = self.crop_to_roi(as_array(self.prev_frame))
+        changed = self.frames_are_different(frame, prev_frame, pyramid, self.prev_pyramid)
+        was_in_motion = self.motion_detector is not None and self.motion_detector.in_motion
+        in_motion = self.update_motion(changed)
+        if was_in_motion and not in_motion:
+            # Before settling, so the change comes ahead of the OCR of the new picture
+            self.report_change_after_motion(frame_ref, frame, fingerprint, roi)
+        if changed and in_motion:
+            self.motion_stats.inc("suppressed_slide_change")
+        elif changed:
             new_event = SlideChangeEvent(
-                slide=frame,
-                previous_slide=self.prev_frame
+                slide=frame_ref,
+                previous_slide=self.prev_frame,
+                fingerprint=fingerprint,
+                changed_regions=self.calculate_changed_regions(frame, prev_frame),
+                roi=roi,
             )
             self.bus.dispatch(new_event)
+            release_after(new_event, frame_ref, self.prev_frame)
+        # Keep settling until the motion stops, the stable picture is then OCR-ed once
+        self.update_settling(frame_ref, frame, fingerprint, changed or in_motion)
 
-        self.prev_frame = frame
+        self._replace_reference("prev_frame", frame_ref)
+        self.prev_pyramid = pyramid
 
 
-__all__ = ["SlideService"]
+__all__ = ["MotionDetector", "SlideService"]
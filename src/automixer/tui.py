@@ -5,6 +5,7 @@ import time
 from dataclasses import dataclass, replace
 from typing import Callable, Optional
 
+from rich.text import Text
 from textual.app import App, ComposeResult
 from textual.binding import Binding
 from textual.containers import Container, Vertical
@@ -14,6 +15,7 @@ from automixer.core.events import (
     MixingResultEvent,
     TranscriptionStateEvent,
     ProgramChangeEvent,
+    ReadingPositionEvent,
     SceneType,
     Slide2CamScoreEvent,
     SlideChangeEvent,
@@ -21,6 +23,7 @@ from automixer.core.events import (
     TranscriptionStateEvent,
 )
 from automixer.mixer import Automixer
+from automixer.services.mixing import ReadingPositionSlide2CamScorer
 from automixer.services.base import BaseService, autoregister
 from automixer.core.bus import EventBus
 
@@ -33,6 +36,8 @@ class UIState:
     slide_text: str = ""
     transcription: str = ""
     slide2cam_score: Optional[float] = None
+    # (Slide words read, slide words) of a reading position scorer
+    reading_position: Optional[tuple[int, int]] = None
     last_decision: Optional[SceneType] = None
     last_decision_at: Optional[float] = None
 
@@ -70,6 +75,7 @@ class UIStateService(BaseService):
     def on_slide_ocr(self, event: SlideOCREvent):
         text = " ".join([elem[1] for elem in event.ocr_result]) if event.ocr_result else ""
         self.state.slide_text = text
+        self.state.reading_position = None
         self._push()
 
     @autoregister
@@ -88,6 +94,11 @@ class UIStateService(BaseService):
         self.state.slide2cam_score = event.score
         self._push()
 
+    @autoregister
+    def on_reading_position(self, event: ReadingPositionEvent):
+        self.state.reading_position = (event.position, event.total)
+        self._push()
+
 
 class LogQueueHandler(logging.Handler):
     """Pipe logging records into an asyncio queue for the UI."""
@@ -196,9 +207,25 @@ class AutomixerApp(App):
         score_text = "-"
         if state.slide2cam_score is not None:
             score_text = f"{state.slide2cam_score:.3f}"
+        if state.reading_position is not None:
+            position, total = state.reading_position
+            score_text += f"\nRead {position}/{total} words"
         score_label.update(score_text)
 
-        slide_label.update(state.slide_text or "-")
+        if state.slide_text and state.reading_position is not None:
+            # Highlight the slide words read so far
+            words = state.slide_text.split()
+            # The cursor skips tokens without letters or digits, count the ones it went past
+            position = ReadingPositionSlide2CamScorer.read_token_count(
+                state.slide_text, state.reading_position[0]
+            )
+            slide_text = Text()
+            slide_text.append(" ".join(words[:position]), style="bold reverse")
+            if position < len(words):
+                slide_text.append((" " if position else "") + " ".join(words[position:]))
+            slide_label.update(slide_text)
+        else:
+            slide_label.update(state.slide_text or "-")
         transcription_label.update(state.transcription or "-")
 
     def action_toggle_pause(self) -> None:
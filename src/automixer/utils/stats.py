@@ -0,0 +1,39 @@
+from collections import Counter
+import time
+
+
+class StatCounters:
+    """Named event counters of a service, with rate-limited logging."""
+
+    def __init__(self, name: str, log_interval: float = 60.0):
+        self.name = name
+        self.log_interval = log_interval
+        self._counts = Counter()
+        self._last_logged_at = time.monotonic()
+
+    def inc(self, key: str, amount: int = 1):
+        self._counts[key] += amount
+
+    def set(self, key: str, value: float):
+        """Set a gauge-like value (e.g. latest latency) next to the counters."""
+        self._counts[key] = value
+
+    def __getitem__(self, key: str) -> int:
+        return self._counts[key]
+
+    def as_dict(self) -> dict:
+        return dict(self._counts)
+
+    def reset(self):
+        self._counts.clear()
+
+    def maybe_log(self, logger):
+        """Log the counters at debug level at most once per `log_interval` seconds."""
+        now = time.monotonic()
+        if now - self._last_logged_at < self.log_interval:
+            return
+        self._last_logged_at = now
+        logger.debug(f"{self.name} stats: {self.as_dict()}")
+
+
+__all__ = ["StatCounters"]
@@ -1,3 +1,7 @@
+from collections import OrderedDict
+import numpy as np
+
+
 def levenshtein_distance(s1, s2):
     """Compute Levenshtein distance using only two rows (space-optimized)."""
     if len(s1) < len(s2):
@@ -18,6 +22,110 @@ def levenshtein_distance(s1, s2):
     return previous[len(s2)]
 
 
+def bounded_levenshtein_distance(s1, s2, max_distance):
+    """
+    Levenshtein distance if it is at most max_distance, else max_distance + 1.
+    Only the diagonal band of width 2 * max_distance + 1 is computed (Ukkonen),
+    and computation stops as soon as a whole row exceeds max_distance.
+    """
+    if len(s1) < len(s2):
+        s1, s2 = s2, s1  # Ensure s1 is longer
+    if len(s1) - len(s2) > max_distance:
+        return max_distance + 1
+
+    # Cells outside the band are at least max_distance + 1 away
+    over = max_distance + 1
+    previous = [min(j, over) for j in range(len(s2) + 1)]
+    for i, c1 in enumerate(s1, 1):
+        current = [over] * (len(s2) + 1)
+        current[0] = min(i, over)
+        row_min = current[0]
+        for j in range(max(1, i - max_distance), min(len(s2), i + max_distance) + 1):
+            value = min(
+                current[j - 1] + 1,
+                previous[j] + 1,
+                previous[j - 1] + (c1 != s2[j - 1]),
+                over,
+            )
+            current[j] = value
+            if value < row_min:
+                row_min = value
+        if row_min > max_distance:
+            return over
+        previous = current
+
+    return previous[len(s2)]
+
+
+class WordMatcher:
+    """
+    Word equality of `lcs_1gram`: equal if the edit distance is within
+    tolerance. Words are interned to integer IDs and the outcome per ID pair
+    is kept in an LRU cache, so recurring word pairs cost a dict lookup
+    across calls, transcription updates and slides. Past max_words interned
+    words, `trim` starts over with empty tables.
+    """
+    def __init__(self, tolerance=0, cache_size=65536, max_words=16384):
+        self.tolerance = tolerance
+        self.cache_size = cache_size
+        self.max_words = max_words
+        self._ids = {}
+        self._words = []
+        self._cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def intern(self, word) -> int:
+        word_id = self._ids.get(word)
+        if word_id is None:
+            word_id = len(self._words)
+            self._ids[word] = word_id
+            self._words.append(word)
+        return word_id
+
+    def intern_all(self, words) -> list[int]:
+        return [self.intern(word) for word in words]
+
+    def word(self, word_id) -> str:
+        return self._words[word_id]
+
+    def equal_ids(self, id1, id2) -> bool:
+        if id1 == id2:
+            return True
+        word1, word2 = self._words[id1], self._words[id2]
+        if self.tolerance == 0 or abs(len(word1) - len(word2)) > self.tolerance:
+            return False
+        key = (id1, id2) if id1 < id2 else (id2, id1)
+        equal = self._cache.get(key)
+        if equal is not None:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return equal
+        self.misses += 1
+        equal = bounded_levenshtein_distance(word1, word2, self.tolerance) <= self.tolerance
+        self._cache[key] = equal
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return equal
+
+    def equal(self, word1, word2) -> bool:
+        return self.equal_ids(self.intern(word1), self.intern(word2))
+
+    def __len__(self):
+        return len(self._words)
+
+    def clear(self):
+        """Forget all words and cached pairs. IDs handed out before become invalid."""
+        self._ids.clear()
+        self._words.clear()
+        self._cache.clear()
+
+    def trim(self):
+        """Clear the tables if more than max_words words are interned. Only call when no IDs are held."""
+        if len(self._words) > self.max_words:
+            self.clear()
+
+
 def lcs(seq1, seq2):
     """Standard LCS for exact matches."""
     m, n = len(seq1), len(seq2)
@@ -46,20 +154,17 @@ def lcs(seq1, seq2):
     return dp[m][n], lcs[::-1]
 
 
-def lcs_1gram(seq1, seq2, tolerance=0):
+def lcs_1gram(seq1, seq2, tolerance=0, matcher=None):
     """
     Optimized 1-gram LCS using fast Levenshtein distance.
     Two words are equal if their distance <= tolerance.
+    A WordMatcher (of the same tolerance) may be passed to reuse its cache.
     """
     m, n = len(seq1), len(seq2)
     dp = [[0] * (n + 1) for _ in range(m + 1)]
-
-    def equal_with_tolerance(a, b):
-        if abs(len(a) - len(b)) > tolerance:
-            return False
-        if tolerance == 0:
-            return a == b
-        return levenshtein_distance(a, b) <= tolerance
+    if matcher is None:
+        matcher = WordMatcher(tolerance)
+    equal_with_tolerance = matcher.equal
 
     # Fill DP table
     for i in range(m):
@@ -85,8 +190,261 @@ def lcs_1gram(seq1, seq2, tolerance=0):
     return dp[m][n], lcs[::-1]
 
 
+def match_masks(seq):
+    """Bit mask of the positions of each distinct item of seq (bit i set if seq[i] is the item)."""
+    masks = {}
+    for i, item in enumerate(seq):
+        masks[item] = masks.get(item, 0) | (1 << i)
+    return masks
+
+
+class BitParallelLCS:
+    """
+    LCS length of a fixed sequence and a growing one, with the bit-vector
+    algorithm of Allison-Dix/Hyyro over a Python int of len(seq1) bits: each
+    item of the growing sequence costs a few big int operations, i.e.
+    O(len(seq1) / 64) word operations. Only the length is computed.
+    """
+    def __init__(self, seq1):
+        self.seq1 = seq1
+        self.full_mask = (1 << len(seq1)) - 1
+        self.masks = match_masks(seq1)
+        self.reset()
+
+    def reset(self):
+        # Zero bits of the state mark the rows where the LCS length increases
+        self.state = self.full_mask
+        self.consumed = 0
+
+    def _advance(self, state, items):
+        masks = self.masks
+        full_mask = self.full_mask
+        for item in items:
+            matches = state & masks.get(item, 0)
+            state = ((state + matches) | (state - matches)) & full_mask
+        return state
+
+    def extend(self, items):
+        self.state = self._advance(self.state, items)
+        self.consumed += len(items)
+
+    def peek(self, items=()) -> int:
+        """LCS length if the sequence was extended by items, without extending it."""
+        return len(self.seq1) - self._advance(self.state, items).bit_count()
+
+    @property
+    def length(self) -> int:
+        return len(self.seq1) - self.state.bit_count()
+
+
+def lcs_length(seq1, seq2):
+    """Length of the LCS of two sequences (bit-parallel), without the LCS itself."""
+    engine = BitParallelLCS(seq1)
+    engine.extend(seq2)
+    return engine.length
+
+
+class ReadingCursor:
+    """
+    Reading position of a speaker in a fixed word sequence, followed word by
+    word: the cursor only moves forward, to just past the first word within
+    `look_ahead` words of it that matches the spoken word (`WordMatcher`
+    equality), so skipped and misheard words don't stall it and words not
+    on the slide leave it in place. Each spoken word costs O(look_ahead).
+    """
+    def __init__(self, seq, tolerance=0, look_ahead=3, matcher=None):
+        self.seq = seq
+        self.look_ahead = look_ahead
+        self.matcher = matcher if matcher is not None else WordMatcher(tolerance)
+        self._ids = self.matcher.intern_all(seq)
+        self.reset()
+
+    def reset(self):
+        self.position = 0
+        self.consumed = 0
+
+    def _advance(self, position, items):
+        equal_ids = self.matcher.equal_ids
+        ids = self._ids
+        for item in items:
+            word_id = self.matcher.intern(item)
+            for i in range(position, min(position + self.look_ahead + 1, len(ids))):
+                if equal_ids(ids[i], word_id):
+                    position = i + 1
+                    break
+        return position
+
+    def extend(self, items):
+        self.position = self._advance(self.position, items)
+        self.consumed += len(items)
+
+    def peek(self, items=()) -> int:
+        """Position if the spoken words were extended by items, without extending them."""
+        return self._advance(self.position, items)
+
+
+class IncrementalLCS1Gram:
+    """
+    `lcs_1gram` of a fixed sequence and a growing one. DP columns are kept
+    for the traceback, so extending by k items costs O(len(seq1) * k) and
+    the traceback O(len(seq1) + len(seq2)). Results are identical to `lcs_1gram`.
+    """
+    def __init__(self, seq1, tolerance=0, matcher=None):
+        self.seq1 = seq1
+        self.matcher = matcher if matcher is not None else WordMatcher(tolerance)
+        self._ids1 = self.matcher.intern_all(seq1)
+        self.reset()
+
+    def reset(self):
+        self.seq2 = []
+        self._ids2 = []
+        self.columns = [[0] * (len(self.seq1) + 1)]
+
+    def truncate(self, n):
+        """Drop all but the first n items of the growing sequence."""
+        del self.seq2[n:]
+        del self._ids2[n:]
+        del self.columns[n + 1:]
+
+    def extend(self, items):
+        equal_ids = self.matcher.equal_ids
+        ids1 = self._ids1
+        column = self.columns[-1]
+        for item in items:
+            id2 = self.matcher.intern(item)
+            new_column = [0] * len(column)
+            for i, id1 in enumerate(ids1):
+                if equal_ids(id1, id2):
+                    new_column[i + 1] = column[i] + 1
+                else:
+                    new_column[i + 1] = max(column[i + 1], new_column[i])
+            self.columns.append(new_column)
+            self.seq2.append(item)
+            self._ids2.append(id2)
+            column = new_column
+
+    def update(self, seq2):
+        """Make seq2 the growing sequence, reusing the columns of its common prefix."""
+        k = min(len(seq2), len(self.seq2))
+        while k > 0 and seq2[k - 1] != self.seq2[k - 1]:
+            k -= 1
+        if seq2[:k] != self.seq2[:k]:
+            k = 0
+        self.truncate(k)
+        self.extend(seq2[k:])
+
+    def result(self):
+        """(LCS length, LCS items of seq1), as returned by `lcs_1gram`."""
+        columns = self.columns
+        lcs = []
+        i, j = len(self.seq1), len(self.seq2)
+        while i > 0 and j > 0:
+            if self.matcher.equal_ids(self._ids1[i - 1], self._ids2[j - 1]):
+                lcs.append(self.seq1[i - 1])
+                i -= 1
+                j -= 1
+            elif columns[j][i - 1] >= columns[j - 1][i]:
+                i -= 1
+            else:
+                j -= 1
+        return columns[-1][-1], lcs[::-1]
+
+
+class VectorizedLCS1Gram(IncrementalLCS1Gram):
+    """
+    `IncrementalLCS1Gram` with the DP in NumPy: word equality comes from a
+    per-slide match table (distinct transcription words x slide positions),
+    and the DP column of each new word is filled at once along the slide,
+    as a running maximum of the match/no-match candidates. Only pays off
+    over the pure-Python engine for long slides. Results are identical.
+    """
+    def reset(self):
+        super().reset()
+        m = len(self.seq1)
+        # Word equality only has to be computed once per distinct slide word
+        self._unique_ids1, self._inverse1 = np.unique(
+            np.asarray(self._ids1, dtype=np.int64), return_inverse=True
+        )
+        # Transcription word ID -> row of the match table
+        self._table_rows = {}
+        self._table = np.zeros((16, m), dtype=bool)
+        self._local2 = []
+        # DP columns, one row per transcription prefix length
+        self._dp = np.zeros((65, m + 1), dtype=np.int32)
+
+    def _table_row(self, word_id) -> int:
+        row = self._table_rows.get(word_id)
+        if row is not None:
+            return row
+        row = len(self._table_rows)
+        if row == self._table.shape[0]:
+            self._table = np.concatenate([self._table, np.zeros_like(self._table)])
+        equal = np.fromiter(
+            (self.matcher.equal_ids(int(id1), word_id) for id1 in self._unique_ids1),
+            dtype=bool, count=len(self._unique_ids1),
+        )
+        self._table[row] = equal[self._inverse1]
+        self._table_rows[word_id] = row
+        return row
+
+    def truncate(self, n):
+        super().truncate(n)
+        del self._local2[n:]
+
+    def extend(self, items):
+        if not items:
+            return
+        n, k = len(self.seq2), len(items)
+        ids2 = [self.matcher.intern(item) for item in items]
+        local2 = [self._table_row(id2) for id2 in ids2]
+        if n + k + 1 > self._dp.shape[0]:
+            grown = np.zeros((2 * (n + k + 1), self._dp.shape[1]), dtype=np.int32)
+            grown[:n + 1] = self._dp[:n + 1]
+            self._dp = grown
+        dp = self._dp
+        table = self._table
+        for j, local in enumerate(local2, n):
+            # Matches extend the diagonal, LCS columns never decrease along the slide
+            previous, column = dp[j], dp[j + 1]
+            np.maximum.accumulate(
+                np.where(table[local], previous[:-1] + 1, previous[1:]), out=column[1:]
+            )
+        self.seq2.extend(items)
+        self._ids2.extend(ids2)
+        self._local2.extend(local2)
+
+    def result(self):
+        dp = self._dp
+        table = self._table
+        local2 = self._local2
+        lcs = []
+        i, j = len(self.seq1), len(self.seq2)
+        length = int(dp[j, i])
+        # item() reads a scalar without creating a NumPy scalar, the path is O(m + n) steps
+        dp_item = dp.item
+        table_item = table.item
+        while i > 0 and j > 0:
+            if table_item(local2[j - 1], i - 1):
+                lcs.append(self.seq1[i - 1])
+                i -= 1
+                j -= 1
+            elif dp_item(j, i - 1) >= dp_item(j - 1, i):
+                i -= 1
+            else:
+                j -= 1
+        return length, lcs[::-1]
+
+
 __all__ = [
     "levenshtein_distance",
+    "bounded_levenshtein_distance",
+    "WordMatcher",
     "lcs",
     "lcs_1gram",
+    "match_masks",
+    "BitParallelLCS",
+    "lcs_length",
+    "ReadingCursor",
+    "IncrementalLCS1Gram",
+    "VectorizedLCS1Gram",
 ]
@@ -35,3 +35,168 @@ def sobel_edge(img, threshold=None):
         edge = np.sqrt(edge)
 
     return edge.astype(np.uint8)
+
+
+def downscale_gray(img, scale):
+    """Downscale a BGR image by `scale` and convert it to grayscale."""
+    if scale < 1.0:
+        img = cv2.resize(img, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    return cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+
+
+def gray_pyramid(img, scales):
+    """Build downscaled grayscale levels of a BGR image, coarsest first."""
+    return [downscale_gray(img, scale) for scale in sorted(scales)]
+
+
+def dhash(gray, hash_size=8):
+    """
+    Difference hash of a grayscale image, as an integer of `hash_size**2` bits.
+    Robust to scaling, brightness and small noise, so it works as a slide fingerprint.
+    """
+    thumbnail = cv2.resize(gray, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    bits = (thumbnail[:, 1:] > thumbnail[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def hamming_distance(hash1, hash2):
+    return (hash1 ^ hash2).bit_count()
+
+
+def detect_content_region(img, black_threshold=24, scale=0.25, symmetry_tolerance=0.02):
+    """
+    Content rectangle (x, y, w, h) of a BGR image inside letterbox/pillarbox
+    bars, or None when there are no bars. Only symmetric bars are cropped, so
+    a dark slide with off-center content is not mistaken for a smaller picture.
+    """
+    gray = downscale_gray(img, scale)
+    height, width = gray.shape
+    content = gray > black_threshold
+    rows = np.flatnonzero(content.any(axis=1))
+    cols = np.flatnonzero(content.any(axis=0))
+    if len(rows) == 0:
+        return None
+
+    def bar_size(start, end, size):
+        before, after = start, size - 1 - end
+        if abs(before - after) > max(1, round(symmetry_tolerance * size)):
+            return 0
+        # Leave one (downscaled) pixel for the blur of the bar edge
+        return max(0, min(before, after) - 1)
+
+    bar_y = bar_size(rows[0], rows[-1], height)
+    bar_x = bar_size(cols[0], cols[-1], width)
+    if bar_x == 0 and bar_y == 0:
+        return None
+    x = bar_x * img.shape[1] // width
+    y = bar_y * img.shape[0] // height
+    return (x, y, img.shape[1] - 2 * x, img.shape[0] - 2 * y)
+
+
+def union_regions(a, b):
+    """Smallest (x, y, w, h) region containing both regions."""
+    x, y = min(a[0], b[0]), min(a[1], b[1])
+    return (
+        x,
+        y,
+        max(a[0] + a[2], b[0] + b[2]) - x,
+        max(a[1] + a[3], b[1] + b[3]) - y,
+    )
+
+
+def layout_fingerprint(img, bands=32, width=320, gradient_threshold=40, density_threshold=0.01):
+    """
+    Text layout signature of a BGR image, as an integer of `bands` bits: one
+    bit per horizontal band, set if the band holds text-like strokes. Slides
+    with the same line layout (e.g. lyrics) share it whatever their words.
+    """
+    gray = downscale_gray(img, min(1.0, width / img.shape[1]))
+    gradient = cv2.morphologyEx(gray, cv2.MORPH_GRADIENT, np.ones((3, 3), np.uint8))
+    strokes = (gradient > gradient_threshold).astype(np.float32)
+    density = cv2.resize(strokes, (1, bands), interpolation=cv2.INTER_AREA).flatten()
+    bits = density > density_threshold
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def changed_regions(gray1, gray2, tile_size, threshold):
+    """
+    Bounding boxes (x, y, w, h) of connected groups of tiles whose mean
+    absolute difference between two grayscale images exceeds `threshold`.
+    """
+    height, width = gray1.shape
+    rows = -(-height // tile_size)
+    cols = -(-width // tile_size)
+    tile_diff = cv2.resize(cv2.absdiff(gray1, gray2), (cols, rows), interpolation=cv2.INTER_AREA)
+    changed = (tile_diff > threshold).astype(np.uint8)
+    _, _, stats, _ = cv2.connectedComponentsWithStats(changed, connectivity=8)
+    regions = []
+    # First component is the unchanged background
+    for col, row, n_cols, n_rows, _ in stats[1:]:
+        x0 = col * width // cols
+        y0 = row * height // rows
+        x1 = -(-(col + n_cols) * width // cols)
+        y1 = -(-(row + n_rows) * height // rows)
+        regions.append((int(x0), int(y0), int(x1 - x0), int(y1 - y0)))
+    return regions
+
+
+class FrameWorkspace:
+    """
+    Scratch buffers for per-frame kernels, reused across frames.
+    Buffers are keyed by name, shape and dtype, so each capture resolution
+    (and each pyramid level) gets its own set, allocated on first use only.
+    """
+    def __init__(self):
+        self._buffers = {}
+        self.allocations = 0
+
+    def buffer(self, name, shape, dtype):
+        key = (name, tuple(shape), np.dtype(dtype))
+        buf = self._buffers.get(key)
+        if buf is None:
+            buf = np.empty(shape, dtype=dtype)
+            self._buffers[key] = buf
+            self.allocations += 1
+        return buf
+
+    def clear(self):
+        self._buffers.clear()
+
+    def gray(self, img):
+        dst = self.buffer("gray", img.shape[:2], np.uint8)
+        return cv2.cvtColor(img, cv2.COLOR_BGR2GRAY, dst=dst)
+
+    def edge_magnitude(self, gray):
+        """Sobel gradient magnitude of a grayscale image."""
+        edge_x = self.buffer("edge_x", gray.shape, np.float32)
+        edge_y = self.buffer("edge_y", gray.shape, np.float32)
+        edge = self.buffer("edge", gray.shape, np.float32)
+        cv2.Sobel(gray, cv2.CV_32F, 1, 0, dst=edge_x, ksize=3)
+        cv2.Sobel(gray, cv2.CV_32F, 0, 1, dst=edge_y, ksize=3)
+        return cv2.magnitude(edge_x, edge_y, magnitude=edge)
+
+    def non_edge_mask(self, img, edge_threshold):
+        """Single-channel mask (255) of pixels whose edge magnitude is below the threshold."""
+        gray = self.gray(img) if img.ndim == 3 else img
+        edge = self.edge_magnitude(gray)
+        mask = self.buffer("non_edge_mask", gray.shape, np.uint8)
+        return cv2.compare(edge, float(edge_threshold), cv2.CMP_LT, dst=mask)
+
+    def abs_diff(self, img1, img2):
+        dst = self.buffer("abs_diff", img1.shape, img1.dtype)
+        return cv2.absdiff(img1, img2, dst=dst)
+
+    def mean_abs_diff(self, img1, img2, mask=None):
+        """
+        Mean absolute difference over all pixels and channels.
+        Pixels outside `mask` count as zero difference.
+        """
+        diff = self.abs_diff(img1, img2)
+        channels = 1 if diff.ndim == 2 else diff.shape[2]
+        if mask is None:
+            return sum(cv2.mean(diff)[:channels]) / channels
+        count = cv2.countNonZero(mask)
+        if count == 0:
+            return 0.0
+        masked_mean = sum(cv2.mean(diff, mask=mask)[:channels])
+        return masked_mean * count / (mask.size * channels)
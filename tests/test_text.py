@@ -0,0 +1,99 @@
+import random
+
+import pytest
+
+from automixer.utils.text import IncrementalLCS1Gram, VectorizedLCS1Gram, WordMatcher, lcs_1gram
+
+
+WORDS = (
+    "amazing grace how sweet the sound that saved a wretch like me i once was lost but now am found "
+    "was blind but now i see twas grace that taught my heart to fear and grace my fears relieved"
+).split()
+
+ENGINES = [IncrementalLCS1Gram, VectorizedLCS1Gram]
+
+RUNS = 200
+
+
+def misheard(word, rng):
+    """Word with a random character dropped or replaced, like transcription errors."""
+    if len(word) < 2 or rng.random() < 0.7:
+        return word
+    i = rng.randrange(len(word))
+    return word[:i] + rng.choice(["", "e", "a"]) + word[i + 1:]
+
+
+def make_transcript(slide, n_words, rng):
+    return [misheard(rng.choice(slide) if rng.random() < 0.8 else rng.choice(WORDS), rng) for _ in range(n_words)]
+
+
+def make_engine(cls, rng):
+    tolerance = rng.randint(0, 3)
+    slide = rng.choices(WORDS, k=rng.randint(0, 20))
+    return cls(slide, tolerance, WordMatcher(tolerance)), slide, tolerance
+
+
+@pytest.mark.parametrize("cls", ENGINES)
+def test_from_scratch(cls):
+    rng = random.Random(0)
+    for _ in range(RUNS):
+        engine, slide, tolerance = make_engine(cls, rng)
+        transcript = make_transcript(slide or WORDS, rng.randint(0, 30), rng)
+        engine.update(transcript)
+        assert engine.result() == lcs_1gram(slide, transcript, tolerance)
+
+
+@pytest.mark.parametrize("cls", ENGINES)
+def test_growing_updates(cls):
+    rng = random.Random(1)
+    for _ in range(RUNS):
+        engine, slide, tolerance = make_engine(cls, rng)
+        transcript = []
+        for _ in range(5):
+            transcript = transcript + make_transcript(slide or WORDS, rng.randint(0, 12), rng)
+            engine.update(transcript)
+            assert engine.result() == lcs_1gram(slide, transcript, tolerance)
+
+
+@pytest.mark.parametrize("cls", ENGINES)
+def test_last_word_rewrite(cls):
+    rng = random.Random(2)
+    for _ in range(RUNS):
+        engine, slide, tolerance = make_engine(cls, rng)
+        transcript = []
+        for _ in range(5):
+            if transcript:
+                # Trailing "..." stripped, or the word re-transcribed, before appending
+                if rng.random() < 0.5:
+                    transcript[-1] = transcript[-1].rstrip(".") or "x"
+                else:
+                    transcript[-1] = rng.choice(WORDS)
+            transcript = transcript + make_transcript(slide or WORDS, rng.randint(0, 12), rng)
+            engine.update(transcript)
+            assert engine.result() == lcs_1gram(slide, transcript, tolerance)
+
+
+@pytest.mark.parametrize("cls", ENGINES)
+def test_reset_restart(cls):
+    rng = random.Random(3)
+    for _ in range(RUNS):
+        engine, slide, tolerance = make_engine(cls, rng)
+        engine.update(make_transcript(slide or WORDS, rng.randint(0, 20), rng))
+        engine.result()
+        engine.reset()
+        transcript = make_transcript(slide or WORDS, rng.randint(0, 20), rng)
+        engine.update(transcript)
+        assert engine.result() == lcs_1gram(slide, transcript, tolerance)
+
+
+@pytest.mark.parametrize("cls", ENGINES)
+def test_unrelated_update(cls):
+    rng = random.Random(4)
+    for _ in range(RUNS):
+        engine, slide, tolerance = make_engine(cls, rng)
+        engine.update(make_transcript(slide or WORDS, rng.randint(1, 20), rng))
+        engine.result()
+        # A new transcription that does not extend the previous one starts over
+        transcript = ["unrelated"] + make_transcript(slide or WORDS, rng.randint(0, 20), rng)
+        engine.update(transcript)
+        assert engine.result() == lcs_1gram(slide, transcript, tolerance)